@@ -0,0 +1,102 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Mathieu Imfeld
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+"""
+Benchmark of request throughput of a single process as concurrency grows
+
+Serves GET /api/platform/v1/resources from an increasing number of threads against a SQLite file database,
+adding a fixed latency to every statement to stand in for a network database. Threads overlap their waits
+on the database, so throughput grows with concurrency until the Python work of each request saturates the
+interpreter. Beyond that point more processes, not more concurrency within one, raise throughput.
+
+    PYTHONPATH=src python bench/bench_concurrency.py --threads 1 4 16 64 --latency 0.005
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark request throughput as concurrency grows')
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4, 16, 64],
+                        help='Numbers of concurrent clients to measure')
+    parser.add_argument('--latency', type=float, default=0.005, help='Seconds added to every statement')
+    parser.add_argument('--limit', type=int, default=100, help='Page size of every request')
+    parser.add_argument('--seconds', type=float, default=3.0, help='Duration of each run')
+    args = parser.parse_args()
+
+    directory = tempfile.TemporaryDirectory()
+    os.environ['APP_CONFIG_DB_URL'] = f'sqlite:///{directory.name}/bench.db'
+    os.environ['APP_CONFIG_DB_POOL_SIZE'] = str(max(args.threads))
+
+    import sqlalchemy
+    from mrmat_python_api_flask import app, db, create_schema
+    from mrmat_python_api_flask.apis.platform.v1 import Owner, Resource
+
+    with app.app_context():
+        create_schema()
+        owner_uid = str(uuid.uuid4())
+        db.session.execute(sqlalchemy.insert(Owner), [{'uid': owner_uid, 'name': 'bench-owner'}])
+        db.session.execute(sqlalchemy.insert(Resource), [
+            {'uid': str(uuid.uuid4()), 'owner_uid': owner_uid, 'name': f'bench-resource-{i}'}
+            for i in range(args.limit)
+        ])
+        db.session.commit()
+        engine = db.engine
+
+    def latency(conn, cursor, statement, parameters, context, executemany):
+        time.sleep(args.latency)
+    sqlalchemy.event.listen(engine, 'before_cursor_execute', latency)
+
+    def run(concurrency: int) -> float:
+        done = []
+        deadline = time.perf_counter() + args.seconds
+
+        def client():
+            count = 0
+            with app.test_client() as c:
+                while time.perf_counter() < deadline:
+                    assert c.get('/api/platform/v1/resources', query_string={'limit': args.limit}).status_code == 200
+                    count += 1
+            done.append(count)
+
+        threads = [threading.Thread(target=client) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return sum(done) / args.seconds
+
+    baseline = None
+    for concurrency in args.threads:
+        throughput = run(concurrency)
+        baseline = baseline or throughput
+        print(f'{concurrency:>4d} threads  {throughput:>10,.0f} requests/s  {throughput / baseline:6.2f}x')
+    directory.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Mathieu Imfeld
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+"""
+Load test of gunicorn with its bare defaults against the packaged configuration
+
+Seeds a SQLite file database, then starts gunicorn once as the container used to (a single sync worker) and
+once with mrmat_python_api_flask.gunicorn_conf, and drives both with the same number of keep-alive clients
+for a fixed duration. Worker class, workers and threads of the packaged configuration can be chosen through
+its usual environment variables.
+
+    PYTHONPATH=src python bench/bench_gunicorn.py --clients 32 --seconds 10
+"""
+
+import argparse
+import http.client
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+from sqlalchemy import create_engine, insert
+
+from mrmat_python_api_flask import ORMBase
+from mrmat_python_api_flask.apis.platform.v1 import Owner, Resource
+
+PATH = '/api/platform/v1/resources?limit=100'
+
+
+def seed(db_url: str, rows: int):
+    engine = create_engine(db_url)
+    ORMBase.metadata.create_all(engine)
+    with engine.begin() as connection:
+        owner_uid = str(uuid.uuid4())
+        connection.execute(insert(Owner), [{'uid': owner_uid, 'name': 'bench-owner'}])
+        connection.execute(insert(Resource), [
+            {'uid': str(uuid.uuid4()), 'owner_uid': owner_uid, 'name': f'bench-resource-{i}'}
+            for i in range(rows)
+        ])
+    engine.dispose()
+
+
+def wait_until_ready(port: int, deadline: float):
+    while time.perf_counter() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/api/healthz/')
+            if connection.getresponse().status == 200:
+                connection.close()
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError('gunicorn did not become ready')
+
+
+def load(port: int, clients: int, seconds: float) -> float:
+    done = []
+    deadline = time.perf_counter() + seconds
+
+    def client():
+        count = 0
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        while time.perf_counter() < deadline:
+            try:
+                connection.request('GET', PATH)
+                response = connection.getresponse()
+                response.read()
+                if response.will_close:
+                    connection.close()
+                count += 1
+            except (OSError, http.client.HTTPException):
+                connection.close()
+        connection.close()
+        done.append(count)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(done) / seconds
+
+
+def run(name: str, arguments: list[str], port: int, db_url: str, clients: int, seconds: float) -> float:
+    env = dict(os.environ, APP_CONFIG_DB_URL=db_url, GUNICORN_BIND=f'127.0.0.1:{port}')
+    process = subprocess.Popen([sys.executable, '-m', 'gunicorn', *arguments, 'mrmat_python_api_flask:app'],
+                               env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_ready(port, time.perf_counter() + 30)
+        throughput = load(port, clients, seconds)
+    finally:
+        process.terminate()
+        process.wait()
+    print(f'{name:10s} {throughput:>10,.0f} requests/s')
+    return throughput
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test gunicorn with and without the packaged configuration')
+    parser.add_argument('--clients', type=int, default=32, help='Number of concurrent keep-alive clients')
+    parser.add_argument('--seconds', type=float, default=10.0, help='Duration of each run')
+    parser.add_argument('--rows', type=int, default=1000, help='Number of resources to seed')
+    parser.add_argument('--port', type=int, default=18000, help='Port to run gunicorn on')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_url = f'sqlite:///{directory}/bench.db'
+        seed(db_url, args.rows)
+        bare = run('bare', ['--bind', f'127.0.0.1:{args.port}'], args.port, db_url, args.clients, args.seconds)
+        tuned = run('packaged', ['-c', 'python:mrmat_python_api_flask.gunicorn_conf'],
+                    args.port + 1, db_url, args.clients, args.seconds)
+    print(f'speedup {tuned / bare:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,324 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Mathieu Imfeld
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+"""
+HTTP benchmark of every blueprint
+
+Seeds a SQLite file database with a dataset of 1k, 100k or 1M resources, then drives each endpoint of the healthz,
+greeting and platform APIs with a number of concurrent clients for a fixed duration. The app is either called
+in-process through its WSGI test client, which leaves out the network and the server, or served by gunicorn with
+the packaged configuration. Each endpoint is reported with its requests per second and its p50, p95 and p99
+latency.
+
+Results can be saved as a JSON baseline and later runs compared against it. A run fails when any endpoint is
+slower than its baseline by more than the tolerance, in throughput or in p95 latency.
+
+    PYTHONPATH=src python bench/bench_http.py --dataset 100k --mode gunicorn --save bench/baselines/gunicorn-100k.json
+    PYTHONPATH=src python bench/bench_http.py --dataset 100k --mode gunicorn --baseline bench/baselines/gunicorn-100k.json
+"""
+
+import argparse
+import dataclasses
+import functools
+import http.client
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import typing
+import uuid
+
+from sqlalchemy import create_engine, insert, select
+
+from mrmat_python_api_flask import ORMBase, create_app
+from mrmat_python_api_flask.config import Config
+from mrmat_python_api_flask.apis.platform.v1 import Owner, Resource
+
+DATASETS = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000}
+RESOURCES_PER_OWNER = 100
+SEED_CHUNK = 10_000
+SAMPLE = 1_000
+
+# A request is the method, the path, an optional JSON body and an optional callback given the parsed response
+Request = tuple[str, str, typing.Any, typing.Callable[[typing.Any], None] | None]
+Send = typing.Callable[[str, str, typing.Any], tuple[int, bytes]]
+
+
+@dataclasses.dataclass
+class Dataset:
+    owner_uids: list[str]
+    resource_uids: list[str]
+    created: list[str] = dataclasses.field(default_factory=list)
+    lock: threading.Lock = dataclasses.field(default_factory=threading.Lock)
+
+    def pick(self, uids: list[str], i: int) -> str:
+        return uids[i % len(uids)]
+
+    def remember(self, body: dict):
+        with self.lock:
+            self.created.append(body['uid'])
+
+    def take(self) -> str | None:
+        with self.lock:
+            return self.created.pop() if self.created else None
+
+
+def seed(db_url: str, rows: int) -> Dataset:
+    engine = create_engine(db_url)
+    ORMBase.metadata.create_all(engine)
+    owner_uids = [str(uuid.uuid4()) for _ in range(max(1, rows // RESOURCES_PER_OWNER))]
+    with engine.begin() as connection:
+        connection.execute(insert(Owner), [{'uid': uid, 'name': f'bench-owner-{i}'}
+                                           for i, uid in enumerate(owner_uids)])
+        for start in range(0, rows, SEED_CHUNK):
+            connection.execute(insert(Resource), [
+                {'uid': str(uuid.uuid4()),
+                 'owner_uid': owner_uids[i % len(owner_uids)],
+                 'name': f'bench-resource-{i}'}
+                for i in range(start, min(start + SEED_CHUNK, rows))
+            ])
+        resource_uids = list(connection.scalars(select(Resource.uid).limit(SAMPLE)))
+    engine.dispose()
+    return Dataset(owner_uids=owner_uids[:SAMPLE], resource_uids=resource_uids)
+
+
+def scenarios(data: Dataset) -> dict[str, typing.Callable[[int], Request | None]]:
+    """
+    Return a function producing the i-th request of each scenario, or None once a scenario has run out of work
+    """
+    def delete_resource(i: int) -> Request | None:
+        uid = data.take()
+        return ('DELETE', f'/api/platform/v1/resources/{uid}', None, None) if uid else None
+
+    return {
+        'healthz': lambda i: ('GET', '/api/healthz/', None, None),
+        'healthz_liveness': lambda i: ('GET', '/api/healthz/liveness', None, None),
+        'healthz_readiness': lambda i: ('GET', '/api/healthz/readiness', None, None),
+        'greeting_v1': lambda i: ('GET', '/api/greeting/v1/', None, None),
+        'greeting_v2': lambda i: ('GET', f'/api/greeting/v2/?name=bench-{i}', None, None),
+        'list_resources': lambda i: ('GET', '/api/platform/v1/resources?limit=100', None, None),
+        'get_resource': lambda i: ('GET', f'/api/platform/v1/resources/{data.pick(data.resource_uids, i)}',
+                                   None, None),
+        'lookup_resources': lambda i: ('POST', '/api/platform/v1/resources:lookup',
+                                       {'uids': [data.pick(data.resource_uids, i + n) for n in range(10)]}, None),
+        'create_resource': lambda i: ('POST', '/api/platform/v1/resources',
+                                      {'name': f'bench-created-{uuid.uuid4()}',
+                                       'owner_uid': data.pick(data.owner_uids, i)}, data.remember),
+        'modify_resource': lambda i: ('PUT', f'/api/platform/v1/resources/{data.pick(data.resource_uids, i)}',
+                                      {'name': f'bench-modified-{uuid.uuid4()}',
+                                       'owner_uid': data.pick(data.owner_uids, i)}, None),
+        'delete_resource': delete_resource,
+        'list_owners': lambda i: ('GET', '/api/platform/v1/owners?limit=100', None, None),
+        'list_owners_with_counts': lambda i: ('GET', '/api/platform/v1/owners?limit=100&with_counts=true',
+                                              None, None),
+        'get_owner': lambda i: ('GET', f'/api/platform/v1/owners/{data.pick(data.owner_uids, i)}', None, None),
+        'owner_resources': lambda i: ('GET', f'/api/platform/v1/owners/{data.pick(data.owner_uids, i)}'
+                                             f'/resources?limit=100', None, None),
+    }
+
+
+def wsgi_client(app) -> Send:
+    client = app.test_client()
+
+    def send(method: str, path: str, body: typing.Any) -> tuple[int, bytes]:
+        response = client.open(path, method=method, json=body)
+        return response.status_code, response.get_data()
+    return send
+
+
+def http_client(port: int) -> Send:
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+
+    def send(method: str, path: str, body: typing.Any) -> tuple[int, bytes]:
+        payload = json.dumps(body) if body is not None else None
+        connection.request(method, path, body=payload,
+                           headers={'Content-Type': 'application/json'} if payload else {})
+        response = connection.getresponse()
+        data = response.read()
+        if response.will_close:
+            connection.close()
+        return response.status, data
+    return send
+
+
+def run(name: str, scenario: typing.Callable[[int], Request | None], make_client: typing.Callable[[], Send],
+        clients: int, seconds: float, warmup: int) -> dict[str, float]:
+    latencies: list[float] = []
+    errors = []
+    counter = iter(range(sys.maxsize))
+    counter_lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def client(measured: bool, limit: float | int):
+        send = make_client()
+        mine, failed = [], 0
+        while (time.perf_counter() < limit) if measured else (len(mine) < limit):
+            with counter_lock:
+                request = scenario(next(counter))
+            if request is None:
+                break
+            method, path, body, callback = request
+            start = time.perf_counter()
+            status, data = send(method, path, body)
+            mine.append(time.perf_counter() - start)
+            if status >= 400:
+                failed += 1
+            elif callback:
+                callback(json.loads(data))
+        if measured:
+            latencies.extend(mine)
+            errors.append(failed)
+
+    client(False, warmup)
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(True, deadline)) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    if len(latencies) < 2:
+        raise RuntimeError(f'{name} completed fewer than two requests')
+    percentiles = statistics.quantiles(latencies, n=100, method='inclusive')
+    result = {
+        'requests': len(latencies),
+        'errors': sum(errors),
+        'rps': len(latencies) / elapsed,
+        'p50_ms': percentiles[49] * 1000,
+        'p95_ms': percentiles[94] * 1000,
+        'p99_ms': percentiles[98] * 1000,
+    }
+    print(f'{name:24s} {result["requests"]:>8d} {result["errors"]:>6d} {result["rps"]:>10,.0f} '
+          f'{result["p50_ms"]:>8.2f} {result["p95_ms"]:>8.2f} {result["p99_ms"]:>8.2f}')
+    return result
+
+
+def compare(results: dict[str, dict[str, float]], baseline: dict, tolerance: float) -> list[str]:
+    """
+    Return a message for every scenario slower than its baseline by more than tolerance
+    """
+    regressions = []
+    for name, result in results.items():
+        before = baseline['results'].get(name)
+        if not before:
+            continue
+        if result['rps'] < before['rps'] * (1 - tolerance):
+            regressions.append(f'{name}: {result["rps"]:,.0f} requests/s, baseline {before["rps"]:,.0f}')
+        if result['p95_ms'] > before['p95_ms'] * (1 + tolerance):
+            regressions.append(f'{name}: p95 {result["p95_ms"]:.2f}ms, baseline {before["p95_ms"]:.2f}ms')
+        if result['errors'] > before['errors']:
+            regressions.append(f'{name}: {result["errors"]} errors, baseline {before["errors"]}')
+    return regressions
+
+
+def wait_until_ready(port: int, deadline: float):
+    while time.perf_counter() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/api/healthz/')
+            if connection.getresponse().status == 200:
+                connection.close()
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError('gunicorn did not become ready')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the HTTP endpoints of every blueprint')
+    parser.add_argument('--dataset', choices=list(DATASETS), default='1k', help='Number of resources to seed')
+    parser.add_argument('--mode', choices=['wsgi', 'gunicorn'], default='wsgi',
+                        help='Call the app in-process or serve it with the packaged gunicorn configuration')
+    parser.add_argument('--clients', type=int, default=4, help='Number of concurrent clients')
+    parser.add_argument('--seconds', type=float, default=3.0, help='Duration of each scenario')
+    parser.add_argument('--warmup', type=int, default=20, help='Number of unmeasured requests per scenario')
+    parser.add_argument('--only', nargs='*', help='Run only these scenarios')
+    parser.add_argument('--port', type=int, default=18100, help='Port to run gunicorn on')
+    parser.add_argument('--save', help='Write the results as a JSON baseline to this file')
+    parser.add_argument('--baseline', help='Compare the results against this JSON baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Share by which an endpoint may be slower than its baseline')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_url = f'sqlite:///{directory}/bench.db'
+        data = seed(db_url, DATASETS[args.dataset])
+        selected = {name: scenario for name, scenario in scenarios(data).items()
+                    if not args.only or name in args.only}
+        process = None
+        if args.mode == 'gunicorn':
+            env = dict(os.environ, APP_CONFIG_DB_URL=db_url, GUNICORN_BIND=f'127.0.0.1:{args.port}')
+            process = subprocess.Popen([sys.executable, '-m', 'gunicorn',
+                                        '-c', 'python:mrmat_python_api_flask.gunicorn_conf',
+                                        'mrmat_python_api_flask:app'],
+                                       env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            wait_until_ready(args.port, time.perf_counter() + 30)
+            make_client = functools.partial(http_client, args.port)
+        else:
+            config = Config()
+            config.db_url = db_url
+            config.metrics_enabled = False
+            app = create_app(config)
+            make_client = functools.partial(wsgi_client, app)
+
+        print(f'{"scenario":24s} {"requests":>8s} {"errors":>6s} {"req/s":>10s} '
+              f'{"p50 ms":>8s} {"p95 ms":>8s} {"p99 ms":>8s}')
+        try:
+            results = {name: run(name, scenario, make_client, args.clients, args.seconds, args.warmup)
+                       for name, scenario in selected.items()}
+        finally:
+            if process:
+                process.terminate()
+                process.wait()
+
+    report = {
+        'mode': args.mode,
+        'dataset': args.dataset,
+        'clients': args.clients,
+        'python': platform.python_version(),
+        'cpus': os.cpu_count(),
+        'results': results,
+    }
+    if args.save:
+        with open(args.save, 'w', encoding='UTF-8') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='UTF-8') as f:
+            baseline = json.load(f)
+        if (baseline['mode'], baseline['dataset'], baseline['clients']) != (args.mode, args.dataset, args.clients):
+            print('The baseline was measured with another mode, dataset or number of clients', file=sys.stderr)
+            sys.exit(2)
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}', file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
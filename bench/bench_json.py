@@ -0,0 +1,76 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Mathieu Imfeld
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+"""
+Microbenchmark of the JSON providers encoding and decoding a large resource listing
+
+    PYTHONPATH=src python bench/bench_json.py --rows 100000
+"""
+
+import argparse
+import time
+import uuid
+
+import flask
+from flask.json.provider import DefaultJSONProvider
+
+from mrmat_python_api_flask.json_provider import OrjsonProvider, orjson
+
+
+def measure(fn, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the JSON providers')
+    parser.add_argument('--rows', type=int, default=100000, help='Number of resources in the listing')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of runs, the best one is reported')
+    args = parser.parse_args()
+    if orjson is None:
+        parser.error('orjson is not installed')
+
+    app = flask.Flask(__name__)
+    owner_uid = str(uuid.uuid4())
+    listing = [{'uid': str(uuid.uuid4()), 'owner_uid': owner_uid, 'name': f'bench-resource-{i}'}
+               for i in range(args.rows)]
+    providers = {'default': DefaultJSONProvider(app), 'orjson': OrjsonProvider(app)}
+    results = {}
+    with app.app_context():
+        for name, provider in providers.items():
+            encoded = provider.response(listing).get_data()
+            encode = measure(lambda: provider.response(listing), args.repeat)
+            decode = measure(lambda: provider.loads(encoded), args.repeat)
+            results[name] = (encode, decode)
+            print(f'{name:8s} encode {args.rows / encode:>12,.0f} rows/s  decode {args.rows / decode:>12,.0f} rows/s  '
+                  f'{len(encoded) / 1024 / 1024:6.1f} MiB')
+    print(f'speedup encode {results["default"][0] / results["orjson"][0]:.2f}x  '
+          f'decode {results["default"][1] / results["orjson"][1]:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
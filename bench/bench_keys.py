@@ -0,0 +1,112 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Mathieu Imfeld
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+"""
+Benchmark of primary key generation and storage
+
+Inserts resources into a fresh SQLite file database for every combination of random UUIDv4 or time-ordered
+UUIDv7 keys and the string, native and binary key storages. Reports the insert throughput overall and over the
+last tenth of the rows, when the indexes are largest, along with the size of the primary key index and of all
+indexes of the resources table. The SQLite profile is off by default, so the indexes outgrow the default page
+cache early, as they would outgrow any cache on a large enough table.
+
+    PYTHONPATH=src python bench/bench_keys.py --rows 500000
+"""
+
+import argparse
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import create_engine, insert, text
+
+from mrmat_python_api_flask import ORMBase
+from mrmat_python_api_flask.config import Config
+from mrmat_python_api_flask.engine import engine_options, configure_engine
+from mrmat_python_api_flask.keys import KEY_STORAGES, uuid7
+from mrmat_python_api_flask.apis.platform.v1 import Owner, Resource
+
+GENERATORS = {'uuid4': uuid.uuid4, 'uuid7': uuid7}
+RESOURCES_PER_OWNER = 100
+
+
+def run(generator: str, storage: str, rows: int, batch: int, profile: bool) -> dict[str, float]:
+    make_key = GENERATORS[generator]
+    with tempfile.TemporaryDirectory() as directory:
+        config = Config()
+        config.db_url = f'sqlite:///{directory}/bench.db'
+        config.db_key_storage = storage
+        config.db_sqlite_profile = profile
+        engine = create_engine(config.db_url, **engine_options(config))
+        configure_engine(engine, config)
+        ORMBase.metadata.create_all(engine)
+        owner_uids = [str(make_key()) for _ in range(max(1, rows // RESOURCES_PER_OWNER))]
+        with engine.begin() as connection:
+            connection.execute(insert(Owner), [{'uid': uid, 'name': f'bench-owner-{i}'}
+                                               for i, uid in enumerate(owner_uids)])
+
+        late = rows - rows // 10
+        start = time.perf_counter()
+        late_start = start
+        for first in range(0, rows, batch):
+            if first >= late and late_start == start:
+                late_start = time.perf_counter()
+            with engine.begin() as connection:
+                connection.execute(insert(Resource), [
+                    {'uid': str(make_key()), 'owner_uid': owner_uids[i % len(owner_uids)],
+                     'name': f'bench-resource-{i}'}
+                    for i in range(first, min(first + batch, rows))
+                ])
+        end = time.perf_counter()
+
+        with engine.connect() as connection:
+            sizes = dict(connection.execute(text('SELECT name, SUM(pgsize) FROM dbstat GROUP BY name')).all())
+        engine.dispose()
+    indexes = [name for name in sizes if name.startswith(('sqlite_autoindex_resources', 'ix_resources'))]
+    return {
+        'rows/s': rows / (end - start),
+        'late rows/s': (rows - late) / (end - late_start),
+        'pk index MiB': sizes['sqlite_autoindex_resources_1'] / 2**20,
+        'indexes MiB': sum(sizes[name] for name in indexes) / 2**20,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark primary key generation and storage')
+    parser.add_argument('--rows', type=int, default=200000, help='Number of resources to insert')
+    parser.add_argument('--batch', type=int, default=1000, help='Number of resources inserted per transaction')
+    parser.add_argument('--storages', nargs='*', choices=KEY_STORAGES, default=list(KEY_STORAGES),
+                        help='Key storages to compare')
+    parser.add_argument('--profile', action='store_true', help='Apply the SQLite profile and its larger caches')
+    args = parser.parse_args()
+
+    print(f'{"keys":6s} {"storage":8s} {"rows/s":>10s} {"late rows/s":>12s} {"pk index MiB":>13s} '
+          f'{"indexes MiB":>12s}')
+    for storage in args.storages:
+        for generator in GENERATORS:
+            result = run(generator, storage, args.rows, args.batch, args.profile)
+            print(f'{generator:6s} {storage:8s} {result["rows/s"]:>10,.0f} {result["late rows/s"]:>12,.0f} '
+                  f'{result["pk index MiB"]:>13.1f} {result["indexes MiB"]:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
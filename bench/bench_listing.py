@@ -0,0 +1,96 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Mathieu Imfeld
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+"""
+Benchmark of the resource listing read path
+
+Seeds an in-memory SQLite database and compares the throughput of hydrating full ORM entities and copying
+them before dumping (the former read path) against selecting plain column rows and dumping them directly.
+
+    PYTHONPATH=src python bench/bench_listing.py --rows 100000
+"""
+
+import argparse
+import time
+import uuid
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from mrmat_python_api_flask import ORMBase
+from mrmat_python_api_flask.apis.platform.v1 import Owner, Resource, resources_schema
+from mrmat_python_api_flask.apis.platform.v1.api import RESOURCE_COLUMNS
+
+
+def seed(session: Session, rows: int):
+    owner_uid = str(uuid.uuid4())
+    session.execute(insert(Owner), [{'uid': owner_uid, 'name': 'bench-owner'}])
+    session.execute(insert(Resource), [
+        {'uid': str(uuid.uuid4()), 'owner_uid': owner_uid, 'name': f'bench-resource-{i}'}
+        for i in range(rows)
+    ])
+    session.commit()
+
+
+def orm_hydration(session: Session) -> int:
+    resources = session.query(Resource).all()
+    dumped = resources_schema.dump(
+        [Resource(uid=r.uid, name=r.name, owner_uid=r.owner_uid) for r in resources]
+    )
+    session.expunge_all()
+    return len(dumped)
+
+
+def column_projection(session: Session) -> int:
+    return len(resources_schema.dump(session.query(*RESOURCE_COLUMNS).all()))
+
+
+def measure(name: str, fn, session: Session, repeat: int):
+    best = None
+    rows = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = fn(session)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f'{name:20s} {rows:>10d} rows  {best:8.3f}s  {rows / best:>12,.0f} rows/s')
+    return rows / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the resource listing read path')
+    parser.add_argument('--rows', type=int, default=100000, help='Number of resources to seed')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of runs, the best one is reported')
+    args = parser.parse_args()
+
+    engine = create_engine('sqlite://', poolclass=StaticPool, connect_args={'check_same_thread': False})
+    ORMBase.metadata.create_all(engine)
+    with Session(engine) as session:
+        seed(session, args.rows)
+        before = measure('orm hydration', orm_hydration, session, args.repeat)
+        after = measure('column projection', column_projection, session, args.repeat)
+    print(f'speedup {after / before:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Mathieu Imfeld
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+"""
+Benchmark of the compiled dump functions against plain marshmallow
+
+    PYTHONPATH=src python bench/bench_serializers.py --rows 100000
+"""
+
+import argparse
+import time
+import uuid
+
+import marshmallow
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from mrmat_python_api_flask import ORMBase
+from mrmat_python_api_flask.apis import Status, status_schema
+from mrmat_python_api_flask.apis.greeting.v1 import GreetingV1, greeting_v1_schema
+from mrmat_python_api_flask.apis.platform.v1 import Owner, Resource, owners_schema, resources_schema
+from mrmat_python_api_flask.apis.platform.v1.api import OWNER_COLUMNS, RESOURCE_COLUMNS
+
+
+def measure(fn, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def compare(name: str, schema: marshmallow.Schema, objs: list, repeat: int):
+    many = schema.many
+    payload = objs if many else objs[0]
+    count = len(objs) if many else 1
+    loops = 1 if many else len(objs)
+    schema.dump(payload)
+    before = measure(lambda: [marshmallow.Schema.dump(schema, payload) for _ in range(loops)], repeat)
+    after = measure(lambda: [schema.dump(payload) for _ in range(loops)], repeat)
+    rate_before = count * loops / before
+    rate_after = count * loops / after
+    print(f'{name:24s} marshmallow {rate_before:>12,.0f}/s  compiled {rate_after:>12,.0f}/s  '
+          f'speedup {rate_after / rate_before:5.2f}x')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark compiled schema dumps')
+    parser.add_argument('--rows', type=int, default=100000, help='Number of resources to dump')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of runs, the best one is reported')
+    args = parser.parse_args()
+
+    engine = create_engine('sqlite://', poolclass=StaticPool, connect_args={'check_same_thread': False})
+    ORMBase.metadata.create_all(engine)
+    with Session(engine) as session:
+        owners = [{'uid': str(uuid.uuid4()), 'name': f'bench-owner-{i}'} for i in range(max(args.rows // 100, 1))]
+        session.execute(insert(Owner), owners)
+        session.execute(insert(Resource), [
+            {'uid': str(uuid.uuid4()), 'owner_uid': owners[i % len(owners)]['uid'], 'name': f'bench-resource-{i}'}
+            for i in range(args.rows)
+        ])
+        session.commit()
+        resource_rows = session.query(*RESOURCE_COLUMNS).all()
+        resource_entities = session.query(Resource).all()
+        owner_rows = session.query(*OWNER_COLUMNS).all()
+
+    compare('resources (rows)', resources_schema, resource_rows, args.repeat)
+    compare('resources (entities)', resources_schema, resource_entities, args.repeat)
+    compare('owners (rows)', owners_schema, owner_rows, args.repeat)
+    compare('status', status_schema, [Status(code=404, msg='No such resource')] * args.rows, args.repeat)
+    compare('greeting v1', greeting_v1_schema, [GreetingV1(message='Hello World')] * args.rows, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
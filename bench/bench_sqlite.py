@@ -0,0 +1,131 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Mathieu Imfeld
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+"""
+Benchmark of concurrent reads and writes against a SQLite file database
+
+Runs reader and writer threads against a fresh database file for a fixed duration, once with the SQLite
+profile (WAL, relaxed synchronisation, memory-mapped I/O) and once with the SQLite defaults, and reports the
+throughput of each along with the number of operations that failed on a locked database.
+
+    PYTHONPATH=src python bench/bench_sqlite.py --readers 4 --writers 2 --seconds 5
+"""
+
+import argparse
+import random
+import tempfile
+import threading
+import time
+import uuid
+
+import sqlalchemy.exc
+from sqlalchemy import create_engine, insert, select
+
+from mrmat_python_api_flask import ORMBase
+from mrmat_python_api_flask.config import Config
+from mrmat_python_api_flask.engine import engine_options, configure_engine
+from mrmat_python_api_flask.apis.platform.v1 import Owner, Resource
+
+
+def run(profile: bool, readers: int, writers: int, seconds: float, owners: int) -> dict[str, int]:
+    with tempfile.TemporaryDirectory() as directory:
+        config = Config()
+        config.db_url = f'sqlite:///{directory}/bench.db'
+        config.db_sqlite_profile = profile
+        config.db_pool_size = readers + writers
+        engine = create_engine(config.db_url, **engine_options(config))
+        configure_engine(engine, config)
+        ORMBase.metadata.create_all(engine)
+        owner_uids = [str(uuid.uuid4()) for _ in range(owners)]
+        with engine.begin() as connection:
+            connection.execute(insert(Owner), [{'uid': uid, 'name': f'bench-owner-{uid}'} for uid in owner_uids])
+
+        counts = {'reads': 0, 'writes': 0, 'errors': 0}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + seconds
+
+        def reader():
+            done = 0
+            failed = 0
+            statement = select(Owner.uid, Owner.name).where(Owner.uid == sqlalchemy.bindparam('uid'))
+            with engine.connect() as connection:
+                while time.perf_counter() < deadline:
+                    try:
+                        connection.execute(statement, {'uid': random.choice(owner_uids)}).one()
+                        connection.rollback()
+                        done += 1
+                    except sqlalchemy.exc.OperationalError:
+                        connection.rollback()
+                        failed += 1
+            with lock:
+                counts['reads'] += done
+                counts['errors'] += failed
+
+        def writer():
+            done = 0
+            failed = 0
+            with engine.connect() as connection:
+                while time.perf_counter() < deadline:
+                    try:
+                        connection.execute(insert(Resource), {'uid': str(uuid.uuid4()),
+                                                              'owner_uid': random.choice(owner_uids),
+                                                              'name': str(uuid.uuid4())})
+                        connection.commit()
+                        done += 1
+                    except sqlalchemy.exc.OperationalError:
+                        connection.rollback()
+                        failed += 1
+            with lock:
+                counts['writes'] += done
+                counts['errors'] += failed
+
+        threads = [threading.Thread(target=reader) for _ in range(readers)] + \
+                  [threading.Thread(target=writer) for _ in range(writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark concurrent SQLite reads and writes')
+    parser.add_argument('--readers', type=int, default=4, help='Number of reader threads')
+    parser.add_argument('--writers', type=int, default=2, help='Number of writer threads')
+    parser.add_argument('--seconds', type=float, default=5.0, help='Duration of each run')
+    parser.add_argument('--owners', type=int, default=1000, help='Number of owners to seed')
+    args = parser.parse_args()
+
+    results = {}
+    for name, profile in (('defaults', False), ('profile', True)):
+        counts = run(profile, args.readers, args.writers, args.seconds, args.owners)
+        results[name] = counts
+        print(f'{name:10s} {counts["reads"] / args.seconds:>12,.0f} reads/s  '
+              f'{counts["writes"] / args.seconds:>10,.0f} writes/s  {counts["errors"]:>6d} errors')
+    for kind in ('reads', 'writes'):
+        if results['defaults'][kind]:
+            print(f'{kind} speedup {results["profile"][kind] / results["defaults"][kind]:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
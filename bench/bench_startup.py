@@ -0,0 +1,86 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Mathieu Imfeld
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+"""
+Benchmark of the cold start of a process
+
+Starts fresh interpreters and measures how long importing the package takes according to python -X importtime,
+and how long it takes from the start of the import until the first response has been served.
+
+    PYTHONPATH=src python bench/bench_startup.py --repeat 5
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+FIRST_RESPONSE = '''
+import time
+start = time.perf_counter()
+import mrmat_python_api_flask
+imported = time.perf_counter()
+client = mrmat_python_api_flask.app.test_client()
+assert client.get('/api/healthz/').status_code == 200
+print(imported - start, time.perf_counter() - start)
+'''
+
+
+def import_time() -> float:
+    """
+    Return the cumulative seconds python -X importtime reports for importing the package
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import mrmat_python_api_flask'],
+                            env=os.environ, capture_output=True, text=True, check=True)
+    for line in result.stderr.splitlines():
+        match = re.match(r'import time:\s+\d+ \|\s+(\d+) \| mrmat_python_api_flask$', line)
+        if match:
+            return int(match.group(1)) / 1e6
+    raise RuntimeError('The package import was not reported')
+
+
+def first_response() -> tuple[float, float]:
+    """
+    Return the seconds until the package was imported and until the first response was served
+    """
+    result = subprocess.run([sys.executable, '-c', FIRST_RESPONSE],
+                            env=os.environ, capture_output=True, text=True, check=True)
+    imported, responded = result.stdout.split()
+    return float(imported), float(responded)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the cold start of a process')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of fresh processes, the median is reported')
+    args = parser.parse_args()
+
+    importtimes = [import_time() for _ in range(args.repeat)]
+    responses = [first_response() for _ in range(args.repeat)]
+    print(f'import (importtime)  {statistics.median(importtimes) * 1000:8.1f}ms')
+    print(f'import               {statistics.median(r[0] for r in responses) * 1000:8.1f}ms')
+    print(f'first response       {statistics.median(r[1] for r in responses) * 1000:8.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
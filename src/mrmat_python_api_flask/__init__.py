@@ -20,19 +20,22 @@
 #  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 #  SOFTWARE.
 
-import importlib.metadata
+import threading
+
 import sqlalchemy.orm
 import flask
 import flask_sqlalchemy
 import flask_marshmallow
-import flask_smorest
 from .config import Config
 
-try:
-    __version__ = importlib.metadata.version('mrmat-python-api-flask')
-except importlib.metadata.PackageNotFoundError:
-    # You have not yet installed this as a package, likely because you're hacking on it in some IDE
-    __version__ = '0.0.0.dev0'
+
+def _version() -> str:
+    import importlib.metadata
+    try:
+        return importlib.metadata.version('mrmat-python-api-flask')
+    except importlib.metadata.PackageNotFoundError:
+        # You have not yet installed this as a package, likely because you're hacking on it in some IDE
+        return '0.0.0.dev0'
 
 
 class ORMBase(sqlalchemy.orm.DeclarativeBase):
@@ -40,42 +43,125 @@ class ORMBase(sqlalchemy.orm.DeclarativeBase):
 
 app_config = Config.from_context()
 
-app = flask.Flask(__name__)
-app.config.setdefault('SQLALCHEMY_DATABASE_URI',app_config.db_url)
-app.config.setdefault('SQLALCHEMY_TRACK_MODIFICATIONS', False)
-app.config.setdefault('SECRET_KEY', app_config.secret_key)
-app.config.setdefault('API_TITLE', 'MrMat :: Python API :: Flask')
-app.config.setdefault('API_VERSION', __version__)
-app.config.setdefault('OPENAPI_VERSION', '3.0.2')
-app.config.setdefault('OPENAPI_URL_PREFIX', '/')
-app.config.setdefault('OPENAPI_SWAGGER_UI_PATH', '/swagger-ui')
-app.config.setdefault('OPENAPI_SWAGGER_UI_URL', "https://cdn.jsdelivr.net/npm/swagger-ui-dist/")
-app.config.setdefault('OPENAPI_REDOC_PATH', '/redoc')
-app.config.setdefault('OPENAPI_REDOC_URL', "https://cdn.jsdelivr.net/npm/redoc@next/bundles/redoc.standalone.js")
-app.config.setdefault('OPENAPI_RAPIDOC_PATH', '/rapidoc')
-app.config.setdefault('OPENAPI_RAPIDOC_URL', "https://unpkg.com/rapidoc/dist/rapidoc-min.js")
-
-db = flask_sqlalchemy.SQLAlchemy(app, model_class=ORMBase)
-ma = flask_marshmallow.Marshmallow(app)
-api = flask_smorest.Api(app)
+db = flask_sqlalchemy.SQLAlchemy(model_class=ORMBase)
+ma = flask_marshmallow.Marshmallow()
 
-#
-# Register APIs
+_app_lock = threading.Lock()
+_schema_lock = threading.Lock()
 
-from mrmat_python_api_flask.apis.healthz import api_healthz
-api.register_blueprint(api_healthz, url_prefix='/api/healthz')
 
-from mrmat_python_api_flask.apis.greeting.v1 import api_greeting_v1
-api.register_blueprint(api_greeting_v1, url_prefix='/api/greeting/v1')
+def create_app(config: Config | None = None) -> flask.Flask:
+    """
+    Create the application for config, or for the configuration of the process when not given. The APIs are
+    imported when the first app is created and the database schema is created along with the first request
+    """
+    config = config or app_config
 
-from mrmat_python_api_flask.apis.greeting.v2 import api_greeting_v2
-api.register_blueprint(api_greeting_v2, url_prefix='/api/greeting/v2')
+    import flask_smorest
+    from .engine import engine_options, configure_engine
+    from .json_provider import create_json_provider
+    from .keys import KeyConverter
+    from .sessions import remove_db
 
-from mrmat_python_api_flask.apis.platform.v1 import api_platform_v1
-api.register_blueprint(api_platform_v1, url_prefix='/api/platform/v1')
+    app = flask.Flask(__name__)
+    app.json = create_json_provider(app, config.json_provider)
+    app.url_map.converters['key'] = KeyConverter
+    app.config.setdefault('SQLALCHEMY_DATABASE_URI', config.db_url)
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(config))
+    app.config.setdefault('SQLALCHEMY_TRACK_MODIFICATIONS', False)
+    app.config.setdefault('SECRET_KEY', config.secret_key)
+    app.config.setdefault('API_TITLE', 'MrMat :: Python API :: Flask')
+    app.config.setdefault('API_VERSION', _version())
+    app.config.setdefault('OPENAPI_VERSION', '3.0.2')
+    app.config.setdefault('OPENAPI_URL_PREFIX', '/')
+    app.config.setdefault('OPENAPI_SWAGGER_UI_PATH', '/swagger-ui')
+    app.config.setdefault('OPENAPI_SWAGGER_UI_URL', "https://cdn.jsdelivr.net/npm/swagger-ui-dist/")
+    app.config.setdefault('OPENAPI_REDOC_PATH', '/redoc')
+    app.config.setdefault('OPENAPI_REDOC_URL', "https://cdn.jsdelivr.net/npm/redoc@next/bundles/redoc.standalone.js")
+    app.config.setdefault('OPENAPI_RAPIDOC_PATH', '/rapidoc')
+    app.config.setdefault('OPENAPI_RAPIDOC_URL', "https://unpkg.com/rapidoc/dist/rapidoc-min.js")
+
+    app.extensions['mrmat_python_api_flask'] = {'schema_created': False}
+    db.init_app(app)
+    ma.init_app(app)
+    api = flask_smorest.Api(app)
+    with app.app_context():
+        configure_engine(db.engine, config)
+        if config.metrics_enabled:
+            from .metrics import init_metrics
+            init_metrics(app, db.engine)
+        from .query_timing import init_query_timing
+        init_query_timing(app, db.engine, config)
+
+    #
+    # Register APIs
+
+    from mrmat_python_api_flask.apis.healthz import api_healthz
+    api.register_blueprint(api_healthz, url_prefix='/api/healthz')
+
+    from mrmat_python_api_flask.apis.greeting.v1 import api_greeting_v1
+    api.register_blueprint(api_greeting_v1, url_prefix='/api/greeting/v1')
+
+    from mrmat_python_api_flask.apis.greeting.v2 import api_greeting_v2
+    api.register_blueprint(api_greeting_v2, url_prefix='/api/greeting/v2')
+
+    from mrmat_python_api_flask.apis.platform.v1 import api_platform_v1
+    from mrmat_python_api_flask.apis.platform.v1.api import init_caches
+    init_caches(app, config)
+    api.register_blueprint(api_platform_v1, url_prefix='/api/platform/v1')
+
+    app.teardown_appcontext(remove_db)
+
+    from .seed import seed_command
+    app.cli.add_command(seed_command)
+
+    #
+    # Profile requests on demand, only wrapping the app when asked for
+
+    if config.profiling_enabled:
+        from .profiling import ProfilingMiddleware
+        from mrmat_python_api_flask.apis.profiling import api_profiling
+        api.register_blueprint(api_profiling, url_prefix='/api/profiling')
+        profiler = ProfilingMiddleware(app.wsgi_app,
+                                       secret_key=config.secret_key,
+                                       directory=config.profiling_dir,
+                                       sample_rate=config.profiling_sample_rate,
+                                       keep=config.profiling_keep,
+                                       exclude='/api/profiling')
+        app.extensions['mrmat_python_api_flask']['profiler'] = profiler
+        app.wsgi_app = profiler
+
+    #
+    # Initialise the database along with the first request
+
+    app.before_request(create_schema)
+    return app
+
+
+def create_schema():
+    """
+    Create the database schema of the current app unless that already happened
+    """
+    state = flask.current_app.extensions['mrmat_python_api_flask']
+    if state['schema_created']:
+        return
+    with _schema_lock:
+        if not state['schema_created']:
+            db.create_all()
+            state['schema_created'] = True
 
-#
-# Initialise the database
 
-with app.app_context():
-    db.create_all()
+def __getattr__(name: str):
+    """
+    Create the app of the process and look up the version when first asked for, so that importing the package
+    stays cheap
+    """
+    if name == '__version__':
+        globals()['__version__'] = _version()
+        return globals()['__version__']
+    if name != 'app':
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    with _app_lock:
+        if 'app' not in globals():
+            globals()['app'] = create_app()
+    return globals()['app']
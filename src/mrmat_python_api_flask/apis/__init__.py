@@ -24,17 +24,22 @@
 Code that can be re-used by all APIs
 """
 
+import base64
+import binascii
 import dataclasses
-from marshmallow import fields, post_load
+
+import flask
+from marshmallow import fields, post_load, validate, ValidationError
 
 from mrmat_python_api_flask import ma
+from mrmat_python_api_flask.serializer import CompiledDumpMixin
 
 @dataclasses.dataclass
 class Status:
     code: int = dataclasses.field(default=500)
     msg: str = dataclasses.field(default='An unknown error occurred')
 
-class StatusSchema(ma.Schema):
+class StatusSchema(CompiledDumpMixin, ma.Schema):
     """
     A generic message class
     """
@@ -56,3 +61,89 @@ class StatusSchema(ma.Schema):
         return Status(**data)
 
 status_schema = StatusSchema()
+
+def status_response(code: int, msg: str) -> flask.Response:
+    """
+    Produce a Status response. Views return it for errors so it is not dumped again through the schema
+    of the successful response.
+    """
+    response = flask.jsonify(status_schema.dump(Status(code=code, msg=msg)))
+    response.status_code = code
+    return response
+
+
+def encode_cursor(key: str) -> str:
+    """
+    Encode the key of the last item on a page into an opaque cursor
+    """
+    return base64.urlsafe_b64encode(key.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str) -> str:
+    """
+    Decode an opaque cursor back into the key it was produced from
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        return base64.b64decode(padded, altchars=b'-_', validate=True).decode('utf-8')
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValidationError('Invalid cursor', field_name='after') from e
+
+def next_page_link(key: str, limit: int) -> str:
+    """
+    Produce a Link header value pointing at the page following the item identified by key. The other query
+    arguments of the request are carried over, so the next page is selected the same way
+    """
+    args = {name: values for name, values in flask.request.args.lists() if name not in ('limit', 'after')}
+    url = flask.url_for(flask.request.endpoint,
+                        **(flask.request.view_args or {}),
+                        **args,
+                        limit=limit,
+                        after=encode_cursor(key))
+    return f'<{url}>; rel="next"'
+
+@dataclasses.dataclass
+class PageInput:
+    limit: int = dataclasses.field(default=100)
+    after: str | None = dataclasses.field(default=None)
+    stream: bool = dataclasses.field(default=False)
+
+class PageInputSchema(ma.Schema):
+    """
+    Keyset pagination arguments
+    """
+    limit = fields.Int(
+        required=False,
+        load_default=100,
+        validate=validate.Range(min=1, max=1000),
+        metadata={
+            'description': 'The maximum number of items to return'
+        })
+
+    after = fields.Str(
+        required=False,
+        load_default=None,
+        metadata={
+            'description': 'Opaque cursor taken from the Link header of the previous page'
+        })
+
+    stream = fields.Bool(
+        required=False,
+        load_default=False,
+        metadata={
+            'description': 'Stream all remaining items as a single JSON array instead of returning a page. '
+                           'Requesting application/x-ndjson has the same effect with one item per line'
+        })
+
+    @post_load
+    def as_object(self, data, **kwargs) -> PageInput:
+        after = decode_cursor(data['after']) if data.get('after') else None
+        return PageInput(limit=data['limit'], after=after, stream=data['stream'])
+
+page_input_schema = PageInputSchema()
+
+PAGE_LINK_HEADER = {
+    'Link': {
+        'description': 'Link to the next page with rel="next", absent on the last page',
+        'schema': {'type': 'string'}
+    }
+}
@@ -26,12 +26,13 @@ import dataclasses
 from marshmallow import fields, post_load
 
 from mrmat_python_api_flask import ma
+from mrmat_python_api_flask.serializer import CompiledDumpMixin
 
 @dataclasses.dataclass
 class GreetingV1:
     message: str = dataclasses.field(default='Hello World')
 
-class GreetingV1Schema(ma.Schema):
+class GreetingV1Schema(CompiledDumpMixin, ma.Schema):
     """
     The GreetingV1 Output Schema
     """
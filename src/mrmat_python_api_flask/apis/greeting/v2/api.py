@@ -41,11 +41,11 @@ bp = Blueprint('greeting_v2', __name__, description='Greeting V2 API')
 @bp.response(200, GreetingV2Schema)
 @bp.doc(summary='Get a greeting for a given name',
         description='This version of the greeting API allows you to specify who to greet')
-def get(greeting_input: GreetingV2Input) -> GreetingV2Schema:
+def get(greeting_input: GreetingV2Input) -> GreetingV2:
     """
     Get a named greeting
     Returns:
         A named greeting in JSON
     """
     safe_name: str = greeting_input.name or 'Stranger'
-    return greeting_v2_schema.dump(obj=GreetingV2(message=f'Hello {safe_name}'))
+    return GreetingV2(message=f'Hello {safe_name}')
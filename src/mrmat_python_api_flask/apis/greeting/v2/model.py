@@ -26,6 +26,7 @@ import dataclasses
 from marshmallow import fields, post_load
 
 from mrmat_python_api_flask import ma
+from mrmat_python_api_flask.serializer import CompiledDumpMixin
 
 @dataclasses.dataclass
 class GreetingV2Input:
@@ -55,7 +56,7 @@ class GreetingV2InputSchema(ma.Schema):
 class GreetingV2:
     message: str = dataclasses.field(default='Hello Stranger')
 
-class GreetingV2Schema(ma.Schema):
+class GreetingV2Schema(CompiledDumpMixin, ma.Schema):
     """
     The GreetingV2 Output Schema
     """
@@ -26,6 +26,7 @@ import dataclasses
 from marshmallow import fields
 
 from mrmat_python_api_flask import ma
+from mrmat_python_api_flask.serializer import CompiledDumpMixin
 
 
 @dataclasses.dataclass
@@ -36,7 +37,7 @@ class GreetingV3:
     message: str
 
 
-class GreetingV3OutputSchema(ma.Schema):
+class GreetingV3OutputSchema(CompiledDumpMixin, ma.Schema):
     """
     The GreetingV3 OutputSchema
     """
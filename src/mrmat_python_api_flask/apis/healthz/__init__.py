@@ -26,6 +26,7 @@
 from .model import (
     Healthz, HealthzSchema, healthz_schema,
     Liveness, LivenessSchema, liveness_schema,
-    Readiness, ReadinessSchema, readiness_schema
+    Readiness, ReadinessSchema, readiness_schema,
+    PoolStats, PoolStatsSchema, pool_stats_schema
 )
 from .api import bp as api_healthz
@@ -26,10 +26,14 @@ Blueprint for the Healthz API
 
 from flask_smorest import Blueprint
 
+from mrmat_python_api_flask import db
+from mrmat_python_api_flask.engine import pool_stats
+
 from .model import (
     Healthz, HealthzSchema, healthz_schema,
     Liveness, LivenessSchema, liveness_schema,
-    Readiness, ReadinessSchema, readiness_schema
+    Readiness, ReadinessSchema, readiness_schema,
+    PoolStats, PoolStatsSchema, pool_stats_schema
 )
 
 bp = Blueprint('healthz', __name__, description='Health API')
@@ -39,35 +43,48 @@ bp = Blueprint('healthz', __name__, description='Health API')
 @bp.response(200, HealthzSchema)
 @bp.doc(summary='Get an indication of overall application health',
         description='Assess application health')
-def healthz() -> HealthzSchema:
+def healthz() -> Healthz:
     """
     Respond with the app health status
     Returns:
         A status response
     """
-    return healthz_schema.dump(Healthz(status='OK'))
+    return Healthz(status='OK')
 
 
 @bp.route('/liveness', methods=['GET'])
 @bp.response(200, LivenessSchema)
 @bp.doc(summary='Get an indication of application liveness',
         description='Assess application liveness')
-def liveness() -> LivenessSchema:
+def liveness() -> Liveness:
     """
     Respond with the app health status
     Returns:
         A status response
     """
-    return liveness_schema.dump(Liveness(status='OK'))
+    return Liveness(status='OK')
 
 @bp.route('/readiness', methods=['GET'])
 @bp.response(200, ReadinessSchema)
 @bp.doc(summary='Get an indication of application readiness',
         description='Assess application liveness')
-def readiness() -> ReadinessSchema:
+def readiness() -> Readiness:
     """
     Respond with the app health status
     Returns:
         A status response
     """
-    return readiness_schema.dump(Readiness(status='OK'))
+    return Readiness(status='OK')
+
+@bp.route('/pool', methods=['GET'])
+@bp.response(200, PoolStatsSchema)
+@bp.doc(summary='Get the state of the database connection pool',
+        description='Report connections in use, overflow and the time spent waiting for connections of this '
+                    'worker process')
+def pool() -> PoolStats:
+    """
+    Respond with the connection pool statistics
+    Returns:
+        A pool statistics response
+    """
+    return PoolStats(**pool_stats(db.engine.pool))
@@ -24,12 +24,13 @@ import dataclasses
 from marshmallow import fields, post_load
 
 from mrmat_python_api_flask import ma
+from mrmat_python_api_flask.serializer import CompiledDumpMixin
 
 @dataclasses.dataclass
 class Healthz:
     status: str = dataclasses.field(default='Unknown')
 
-class HealthzSchema(ma.Schema):
+class HealthzSchema(CompiledDumpMixin, ma.Schema):
     status = fields.Str(
         required=True,
         metadata={
@@ -44,7 +45,7 @@ class HealthzSchema(ma.Schema):
 class Liveness:
     status: str = dataclasses.field(default='Unknown')
 
-class LivenessSchema(ma.Schema):
+class LivenessSchema(CompiledDumpMixin, ma.Schema):
     status = fields.Str(
         required=True,
         metadata={
@@ -70,6 +71,71 @@ class ReadinessSchema(HealthzSchema):
     def as_object(self, data, **kwargs) -> Readiness:
         return Readiness(**data)
 
+@dataclasses.dataclass
+class PoolStats:
+    pool: str
+    size: int | None = dataclasses.field(default=None)
+    checked_out: int | None = dataclasses.field(default=None)
+    checked_in: int | None = dataclasses.field(default=None)
+    overflow: int | None = dataclasses.field(default=None)
+    checkouts: int | None = dataclasses.field(default=None)
+    timeouts: int | None = dataclasses.field(default=None)
+    wait_time_total: float | None = dataclasses.field(default=None)
+    wait_time_max: float | None = dataclasses.field(default=None)
+
+class PoolStatsSchema(CompiledDumpMixin, ma.Schema):
+    pool = fields.Str(
+        required=True,
+        metadata={
+            'description': 'The class of the connection pool'
+        })
+    size = fields.Int(
+        allow_none=True,
+        metadata={
+            'description': 'The number of connections the pool keeps open'
+        })
+    checked_out = fields.Int(
+        allow_none=True,
+        metadata={
+            'description': 'The number of connections currently in use'
+        })
+    checked_in = fields.Int(
+        allow_none=True,
+        metadata={
+            'description': 'The number of idle connections in the pool'
+        })
+    overflow = fields.Int(
+        allow_none=True,
+        metadata={
+            'description': 'The number of connections opened beyond the pool size, negative while the pool '
+                           'is not yet full'
+        })
+    checkouts = fields.Int(
+        allow_none=True,
+        metadata={
+            'description': 'The number of connections handed out since the pool was created'
+        })
+    timeouts = fields.Int(
+        allow_none=True,
+        metadata={
+            'description': 'The number of checkouts that gave up waiting for a connection'
+        })
+    wait_time_total = fields.Float(
+        allow_none=True,
+        metadata={
+            'description': 'The total number of seconds spent waiting for connections'
+        })
+    wait_time_max = fields.Float(
+        allow_none=True,
+        metadata={
+            'description': 'The longest number of seconds spent waiting for a single connection'
+        })
+
+    @post_load
+    def as_object(self, data, **kwargs) -> PoolStats:
+        return PoolStats(**data)
+
 healthz_schema = HealthzSchema()
 liveness_schema = LivenessSchema()
 readiness_schema = ReadinessSchema()
+pool_stats_schema = PoolStatsSchema()
@@ -27,6 +27,14 @@ from .api import bp as api_platform_v1
 from .model import (
     OwnerInput, OwnerInputSchema, owner_input_schema,
     OwnerSchema, owner_schema, owners_schema,
+    OwnerDocumentSchema, owner_document_schema,
+    OwnerIncludeInput, OwnerIncludeInputSchema, owner_include_input_schema,
+    OwnerPageInput, OwnerPageInputSchema, owner_page_input_schema,
     ResourceInput, ResourceInputSchema, resource_input_schema,
-    ResourceSchema, resource_schema, resources_schema, Owner, Resource
+    ResourceSchema, resource_schema, resources_schema, Owner, Resource,
+    BatchItemStatus, BatchItemStatusSchema, BatchResult, BatchResultSchema, batch_result_schema,
+    ImportItemStatus, ImportItemStatusSchema, ImportResult, ImportResultSchema, import_result_schema,
+    LookupInput, LookupInputSchema, lookup_input_schema,
+    OwnerLookup, OwnerLookupSchema, owner_lookup_schema,
+    ResourceLookup, ResourceLookupSchema, resource_lookup_schema
 )
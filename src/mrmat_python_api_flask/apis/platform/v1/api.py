@@ -22,58 +22,379 @@
 
 """Blueprint for the Resource API in V1
 """
-import uuid
-from typing import Tuple
+import csv
+from typing import Iterator, Sequence, Tuple
 
-from flask import g, jsonify
+from flask import g, jsonify, current_app, request, stream_with_context, Flask, Response
 from flask_smorest import Blueprint
+from marshmallow import ValidationError
+from sqlalchemy import func, insert, select
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.exc import StaleDataError
+from werkzeug.http import quote_etag
 
 from mrmat_python_api_flask import db
-from mrmat_python_api_flask.apis import Status, status_schema
+from mrmat_python_api_flask.config import Config
+from mrmat_python_api_flask.cache import EntityCache
+from mrmat_python_api_flask.keys import new_key
+from mrmat_python_api_flask.apis import (
+    status_response,
+    PageInput, PageInputSchema, PAGE_LINK_HEADER, next_page_link
+)
 from .model import (
     Owner, Resource,
     OwnerInput, OwnerInputSchema,
-    OwnerSchema, owner_schema, owners_schema,
-    ResourceInput, ResourceInputSchema,
-    ResourceSchema, resource_schema, resources_schema
+    OwnerSchema, owner_schema,
+    OwnerDocumentSchema, OwnerIncludeInput, OwnerIncludeInputSchema,
+    OwnerPageInput, OwnerPageInputSchema,
+    ResourceInput, ResourceInputSchema, resource_input_schema,
+    ResourceSchema, resource_schema,
+    BatchItemStatus, BatchResult, BatchResultSchema,
+    ImportItemStatus, ImportResult, ImportResultSchema,
+    LookupInput, LookupInputSchema,
+    OwnerLookup, OwnerLookupSchema,
+    ResourceLookup, ResourceLookupSchema
 )
 
 bp = Blueprint('platform_v1', __name__, description='Platform V1 API')
 
+
+def init_caches(app: Flask, config: Config):
+    """
+    Give app empty caches of this API sized by config. Each app keeps its own, so apps of the same process
+    never see each other's entities
+    """
+    app.extensions['mrmat_python_api_flask']['caches'] = {
+        # Rows of RESOURCE_COLUMNS and OWNER_COLUMNS by uid, invalidated after every committed change
+        'resources': EntityCache(maxsize=config.cache_size, ttl=config.cache_ttl, enabled=config.cache_enabled),
+        'owners': EntityCache(maxsize=config.cache_size, ttl=config.cache_ttl, enabled=config.cache_enabled),
+        # Pages of owners with their resource counts by (after, limit), cleared whenever owners or resources change
+        'owner_counts': EntityCache(maxsize=config.cache_size, ttl=config.cache_ttl, enabled=config.cache_enabled)
+    }
+
+
+def caches() -> dict[str, EntityCache]:
+    """
+    Return the caches of the current app by name
+    """
+    return current_app.extensions['mrmat_python_api_flask']['caches']
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+CSV_MIMETYPE = 'text/csv'
+
+# Listings select just the columns the schemas serialize as plain rows, which skips ORM hydration
+RESOURCE_COLUMNS = (Resource.uid, Resource.owner_uid, Resource.name, Resource.version)
+OWNER_COLUMNS = (Owner.uid, Owner.client_id, Owner.name, Owner.version)
+
+ETAG_HEADER = {
+    'ETag': {
+        'description': 'The current version of the entity, usable with If-None-Match, and with If-Match on '
+                       'modification and removal',
+        'schema': {'type': 'string'}
+    }
+}
+STREAM_CHUNK_SIZE = 1000
+BATCH_CHUNK_SIZE = 1000
+# Stays below the bound parameter limit of older SQLite versions
+LOOKUP_CHUNK_SIZE = 500
+# Imports read IMPORT_READ_SIZE bytes at a time, accept lines of at most IMPORT_MAX_LINE bytes and commit every
+# IMPORT_CHUNK_SIZE records, so their memory is bounded whatever the size of the upload. At most IMPORT_MAX_ERRORS
+# failed records are reported individually
+IMPORT_CHUNK_SIZE = 1000
+IMPORT_READ_SIZE = 64 * 1024
+IMPORT_MAX_LINE = 64 * 1024
+IMPORT_MAX_ERRORS = 100
+
 @bp.errorhandler(SQLAlchemyError)
 def db_error(e):
     return jsonify(error=str(e)), 500
 
+@bp.errorhandler(StaleDataError)
+def stale_data_error(e):
+    return status_response(412, 'The entity was modified concurrently')
+
 
 def _extract_identity() -> Tuple:
     return g.oidc_token_info['client_id'], g.oidc_token_info['username']
 
 
+def _keyset_page(query, key, page: PageInput) -> Tuple[Sequence, dict]:
+    """
+    Return a single page of query ordered by the indexed key column, along with the response headers
+    linking to the next page. One more row than requested is fetched to learn whether a next page exists
+    without having to count the table.
+    """
+    if page.after is not None:
+        query = query.filter(key > page.after)
+    items = query.order_by(key).limit(page.limit + 1).all()
+    headers = {}
+    if len(items) > page.limit:
+        items = items[:page.limit]
+        headers['Link'] = next_page_link(getattr(items[-1], key.key), page.limit)
+    return tuple(items), headers
+
+
+def _chunks(items: Sequence, size: int) -> Iterator[Sequence]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _bulk_insert(model, rows: list[dict]):
+    """
+    Insert rows in chunks of executemany-style bulk inserts. The caller commits, so all chunks form a single
+    transaction.
+    """
+    for chunk in _chunks(rows, BATCH_CHUNK_SIZE):
+        db.session.execute(insert(model), chunk)
+
+
+def _admit_resources(data: Sequence[ResourceInput]) -> Tuple[list[dict], list[BatchItemStatus]]:
+    """
+    Decide which of the submitted resources can be created. Returns the rows to insert along with the outcome
+    for each submitted resource. Resources of unknown owners and resources whose owner already has a resource
+    of the same name, in the database or earlier in data, are refused.
+    """
+    owner_uids = list({str(item.owner_uid) for item in data})
+    known_owners = set()
+    for chunk in _chunks(owner_uids, LOOKUP_CHUNK_SIZE):
+        known_owners.update(db.session.scalars(select(Owner.uid).where(Owner.uid.in_(chunk))))
+    # Names are looked up per owner, because SQLite scans the whole table rather than use the unique index for
+    # a long IN list of (owner_uid, name) pairs
+    names_by_owner: dict[str, set[str]] = {}
+    for item in data:
+        if str(item.owner_uid) in known_owners:
+            names_by_owner.setdefault(str(item.owner_uid), set()).add(item.name)
+    taken = set()
+    for owner_uid, names in names_by_owner.items():
+        for chunk in _chunks(list(names), LOOKUP_CHUNK_SIZE):
+            taken.update((owner_uid, name) for name in db.session.scalars(
+                select(Resource.name).where(Resource.owner_uid == owner_uid, Resource.name.in_(chunk))
+            ))
+
+    rows, items = [], []
+    for item in data:
+        key = (str(item.owner_uid), item.name)
+        if key[0] not in known_owners:
+            items.append(BatchItemStatus(code=404, msg='No such owner'))
+        elif key in taken:
+            items.append(BatchItemStatus(code=409, msg='The owner already has a resource with this name'))
+        else:
+            taken.add(key)
+            rows.append({'uid': new_key(), 'owner_uid': key[0], 'name': item.name})
+            items.append(BatchItemStatus(code=201, msg='Created', uid=rows[-1]['uid']))
+    return rows, items
+
+
+def _upload_lines(stream) -> Iterator[Tuple[int, bytes | None]]:
+    """
+    Read an upload in blocks of IMPORT_READ_SIZE and split it into lines, yielded along with their numbers
+    without the line break. Lines longer than IMPORT_MAX_LINE are skipped and yielded as None.
+    """
+    number, pending, overlong = 0, b'', False
+    while block := stream.read(IMPORT_READ_SIZE):
+        if overlong:
+            end = block.find(b'\n')
+            if end < 0:
+                continue
+            number += 1
+            yield number, None
+            block, overlong = block[end + 1:], False
+        *lines, pending = (pending + block).split(b'\n')
+        for line in lines:
+            number += 1
+            yield number, line if len(line) <= IMPORT_MAX_LINE else None
+        if len(pending) > IMPORT_MAX_LINE:
+            pending, overlong = b'', True
+    if pending or overlong:
+        yield number + 1, None if overlong else pending
+
+
+def _import_records(stream, mimetype: str) -> Iterator[Tuple[int, dict | ImportItemStatus]]:
+    """
+    Parse the records of an NDJSON or CSV upload as they arrive. Yields the line of each record along with the
+    record, or with the reason it could not be read. CSV uploads start with a header naming the columns.
+    """
+    if mimetype == NDJSON_MIMETYPE:
+        for number, line in _upload_lines(stream):
+            if line is None:
+                yield number, ImportItemStatus(line=number, code=413, msg='The line is too long')
+            elif line.strip():
+                try:
+                    yield number, current_app.json.loads(line)
+                except ValueError:
+                    yield number, ImportItemStatus(line=number, code=400, msg='The line is not valid JSON')
+        return
+
+    unreadable: list[ImportItemStatus] = []
+
+    def text() -> Iterator[str]:
+        for number, line in _upload_lines(stream):
+            try:
+                if line is not None:
+                    yield line.decode('utf-8-sig') + '\n'
+                    continue
+                unreadable.append(ImportItemStatus(line=number, code=413, msg='The line is too long'))
+            except UnicodeDecodeError:
+                unreadable.append(ImportItemStatus(line=number, code=400, msg='The line is not valid UTF-8'))
+            yield '\n'
+
+    reader = csv.DictReader(text())
+    while True:
+        try:
+            record = next(reader)
+        except StopIteration:
+            break
+        except csv.Error as e:
+            record = ImportItemStatus(line=reader.line_num, code=400, msg=f'The line is not valid CSV: {e}')
+        for status in unreadable:
+            yield status.line, status
+        unreadable.clear()
+        yield reader.line_num, record
+    for status in unreadable:
+        yield status.line, status
+
+
+def _validation_message(e: ValidationError) -> str:
+    if not isinstance(e.messages, dict):
+        return str(e.messages)
+    return '; '.join(f'{field}: {" ".join(str(m) for m in messages) if isinstance(messages, list) else messages}'
+                     for field, messages in e.messages.items())
+
+
+def _lookup(columns, key, uids: list[str]) -> Tuple[list, list[str]]:
+    """
+    Look up many rows by key with WHERE key IN (...) queries of LOOKUP_CHUNK_SIZE keys each. Returns the rows
+    found in the order they were asked for along with the keys that were not found.
+    """
+    wanted = list(dict.fromkeys(uids))
+    found = {}
+    for chunk in _chunks(wanted, LOOKUP_CHUNK_SIZE):
+        for row in db.session.query(*columns).filter(key.in_(chunk)):
+            found[getattr(row, key.key)] = row
+    return [found[uid] for uid in wanted if uid in found], [uid for uid in wanted if uid not in found]
+
+
+def _etag_headers(version: int) -> dict:
+    return {'ETag': quote_etag(str(version))}
+
+
+def _not_modified(model, cache: EntityCache, uid: str) -> Response | None:
+    """
+    Answer a conditional GET with 304 Not Modified if the If-None-Match header matches the current version of
+    the entity. The version is taken from the cache or read on its own, before the row is loaded and without
+    serializing it.
+    """
+    if not request.if_none_match:
+        return None
+    cached = cache.peek(uid)
+    version = cached.version if cached is not None \
+        else db.session.scalar(select(model.version).where(model.uid == uid))
+    if version is None or not request.if_none_match.contains_weak(str(version)):
+        return None
+    return Response(status=304, headers=_etag_headers(version))
+
+
+def _precondition_failed(entity) -> bool:
+    return bool(request.if_match) and not request.if_match.contains(str(entity.version))
+
+
+def _wants_stream(page: PageInput) -> bool:
+    return page.stream or _wants_ndjson()
+
+
+def _wants_ndjson() -> bool:
+    return request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+
+def _stream(query, key, page: PageInput, schema) -> Response:
+    """
+    Stream all rows of query following the optional cursor as NDJSON or as a single JSON array. Rows are
+    fetched STREAM_CHUNK_SIZE at a time from a server-side cursor and written out as they arrive, so memory
+    stays flat regardless of the table size.
+    """
+    if page.after is not None:
+        query = query.filter(key > page.after)
+    query = query.order_by(key).yield_per(STREAM_CHUNK_SIZE)
+    ndjson = _wants_ndjson()
+    dumps = current_app.json.dumps
+
+    def generate():
+        if not ndjson:
+            yield '['
+        separator = '' if ndjson else ','
+        terminator = '\n' if ndjson else ''
+        leading = ''
+        rows = []
+        for item in query:
+            rows.append(item)
+            if len(rows) == STREAM_CHUNK_SIZE:
+                yield leading + separator.join(dumps(row) + terminator for row in schema.dump(rows, many=True))
+                leading, rows = separator, []
+        if rows:
+            yield leading + separator.join(dumps(row) + terminator for row in schema.dump(rows, many=True))
+        if not ndjson:
+            yield ']\n'
+
+    return Response(stream_with_context(generate()),
+                    mimetype=NDJSON_MIMETYPE if ndjson else 'application/json')
+
+
 @bp.route('/resources', methods=['GET'])
 @bp.doc(summary='Get all known resources',
-        description='Returns all currently known resources and their metadata',
+        description='Returns currently known resources and their metadata, one page at a time in the order '
+                    'of their resource id. Follow the Link header to retrieve the next page',
         security=[{'openId': ['mpaflask-read']}])
-@bp.response(200, schema=ResourceSchema(many=True))
-def get_resources():
+@bp.arguments(PageInputSchema,
+              location='query',
+              required=False,
+              description='Pagination of the resources')
+@bp.response(200, schema=ResourceSchema(many=True), headers=PAGE_LINK_HEADER)
+@bp.alt_response(200,
+                 schema=ResourceSchema,
+                 content_type=NDJSON_MIMETYPE,
+                 description='All remaining resources, one per line',
+                 success=True)
+def get_resources(page: PageInput):
     #(client_id, name) = _extract_identity()
-    resources = db.session.query(Resource).all()
-    return resources_schema.dump(
-        [Resource(uid=r.uid, name=r.name, owner_uid=r.owner_uid) for r in resources]
-    ), 200
+    query = db.session.query(*RESOURCE_COLUMNS)
+    if _wants_stream(page):
+        return _stream(query, Resource.uid, page, resource_schema)
+    resources, headers = _keyset_page(query, Resource.uid, page)
+    return resources, 200, headers
 
 
-@bp.route('/resources/<string:uid>', methods=['GET'])
+@bp.route('/resources/<key:uid>', methods=['GET'])
 @bp.doc(summary='Get a single resource',
         description='Return a single resource identified by its resource id',
         security=[{'openId': ['mpaflask-read']}])
-@bp.response(200, schema=ResourceSchema)
+@bp.response(200, schema=ResourceSchema, headers=ETAG_HEADER)
 def get_resource(uid: str):
     #(client_id, name) = _extract_identity()
-    resource = db.session.get(Resource, uid)
+    not_modified = _not_modified(Resource, caches()['resources'], uid)
+    if not_modified:
+        return not_modified
+    resource = caches()['resources'].get_or_load(
+        uid, lambda: db.session.query(*RESOURCE_COLUMNS).filter(Resource.uid == uid).first())
     if not resource:
-        return status_schema.dump(Status(code=404, msg='No such resource')), 404
-    return resource_schema.dump(resource), 200
+        return status_response(404, 'No such resource')
+    return resource, 200, _etag_headers(resource.version)
+
+
+@bp.route('/resources:lookup', methods=['POST'])
+@bp.doc(summary='Get many resources',
+        description='Return the resources identified by a list of resource ids along with the ids that were not '
+                    'found',
+        security=[{'openId': ['mpaflask-read']}])
+@bp.arguments(LookupInputSchema,
+              location='json',
+              required=True,
+              description='The resource ids to look up')
+@bp.response(200, schema=ResourceLookupSchema)
+def lookup_resources(data: LookupInput):
+    #(client_id, name) = _extract_identity()
+    resources, missing = _lookup(RESOURCE_COLUMNS, Resource.uid, data.uids)
+    return ResourceLookup(resources=resources, missing=missing), 200
 
 
 @bp.route('/resources', methods=['POST'])
@@ -84,15 +405,96 @@ def get_resource(uid: str):
               location='json',
               required=True,
               description='The resource to create')
-@bp.response(201, schema=ResourceSchema)
+@bp.response(201, schema=ResourceSchema, headers=ETAG_HEADER)
 def create_resource(data: ResourceInput):
     #(client_id, name) = _extract_identity()
-    resource = Resource(uid=str(uuid.uuid4()), name=data.name, owner_uid=str(data.owner_uid))
+    resource = Resource(uid=new_key(), name=data.name, owner_uid=str(data.owner_uid))
     db.session.add(resource)
     db.session.commit()
-    return resource_schema.dump(resource), 201
+    caches()['resources'].invalidate(resource.uid)
+    caches()['owner_counts'].clear()
+    return resource, 201, _etag_headers(resource.version)
+
+@bp.route('/resources:batch', methods=['POST'])
+@bp.doc(summary='Create resources in bulk',
+        description='Create many resources within a single transaction. Resources that would duplicate the name of '
+                    'another resource of the same owner or which refer to an unknown owner are not created and '
+                    'reported individually',
+        security=[{'openId': ['mpaflask-write']}])
+@bp.arguments(ResourceInputSchema(many=True),
+              location='json',
+              required=True,
+              description='The resources to create')
+@bp.response(200, schema=BatchResultSchema)
+def create_resources(data: list[ResourceInput]):
+    #(client_id, name) = _extract_identity()
+    rows, items = _admit_resources(data)
+    _bulk_insert(Resource, rows)
+    db.session.commit()
+    caches()['resources'].invalidate(*[row['uid'] for row in rows])
+    caches()['owner_counts'].clear()
+    return BatchResult(created=len(rows), failed=len(data) - len(rows), items=items), 200
+
+@bp.route('/resources:import', methods=['POST'])
+@bp.doc(summary='Import resources from NDJSON or CSV',
+        description='Create resources from an upload of any size, parsed as it arrives. Send one JSON object '
+                    f'per line as {NDJSON_MIMETYPE}, or {CSV_MIMETYPE} with a header row naming the name and '
+                    f'owner_uid columns. Records are committed in chunks of {IMPORT_CHUNK_SIZE}, so the chunks '
+                    'before a failure stay imported. Records that are invalid, refer to an unknown owner or '
+                    'duplicate the name of another resource of the same owner are skipped and reported by line',
+        requestBody={
+            'required': True,
+            'content': {
+                NDJSON_MIMETYPE: {'schema': ResourceInputSchema},
+                CSV_MIMETYPE: {'schema': {'type': 'string'}}
+            }
+        },
+        security=[{'openId': ['mpaflask-write']}])
+@bp.response(200, schema=ImportResultSchema)
+def import_resources():
+    #(client_id, name) = _extract_identity()
+    if request.mimetype not in (NDJSON_MIMETYPE, CSV_MIMETYPE):
+        return status_response(415, f'Resources are imported from {NDJSON_MIMETYPE} or {CSV_MIMETYPE}')
+    result = ImportResult()
+    # The records read since the last commit, parsed or with the reason they were refused, in the order of the upload
+    chunk: list[Tuple[int, ResourceInput | ImportItemStatus]] = []
+
+    def commit():
+        rows, statuses = _admit_resources([item for _, item in chunk if isinstance(item, ResourceInput)])
+        admitted = iter(statuses)
+        for line, item in chunk:
+            status = next(admitted) if isinstance(item, ResourceInput) else item
+            if status.code == 201:
+                continue
+            result.failed += 1
+            if len(result.errors) < IMPORT_MAX_ERRORS:
+                result.errors.append(ImportItemStatus(line=line, code=status.code, msg=status.msg))
+            else:
+                result.errors_truncated = True
+        _bulk_insert(Resource, rows)
+        db.session.commit()
+        caches()['resources'].invalidate(*[row['uid'] for row in rows])
+        caches()['owner_counts'].clear()
+        result.created += len(rows)
+        result.chunks += 1
+        chunk.clear()
 
-@bp.route('/resources/<string:uid>', methods=['PUT'])
+    for line, record in _import_records(request.stream, request.mimetype):
+        result.records += 1
+        if isinstance(record, ImportItemStatus):
+            chunk.append((line, record))
+        else:
+            try:
+                chunk.append((line, resource_input_schema.load(record)))
+            except ValidationError as e:
+                chunk.append((line, ImportItemStatus(line=line, code=400, msg=_validation_message(e))))
+        if len(chunk) == IMPORT_CHUNK_SIZE:
+            commit()
+    if chunk:
+        commit()
+    return result, 200
+
+@bp.route('/resources/<key:uid>', methods=['PUT'])
 @bp.doc(summary='Modify a resource',
         description='Modify a resource owned by the authenticated user',
         security=[{'openId': ['mpaflask-write']}])
@@ -100,18 +502,21 @@ def create_resource(data: ResourceInput):
               location='json',
               required=True,
               description='The resource with updated contents')
-@bp.response(200, schema=ResourceSchema)
+@bp.response(200, schema=ResourceSchema, headers=ETAG_HEADER)
 def modify_resource(data: ResourceInput, uid: str):
     #(client_id, name) = _extract_identity()
     resource = db.session.get(Resource, uid)
     if not resource:
-        return status_schema.dump(Status(code=404, msg='No such resource')), 404
+        return status_response(404, 'No such resource')
+    if _precondition_failed(resource):
+        return status_response(412, 'The resource was modified')
     resource.name = data.name
     db.session.add(resource)
     db.session.commit()
-    return resource_schema.dump(resource), 200
+    caches()['resources'].invalidate(uid)
+    return resource, 200, _etag_headers(resource.version)
 
-@bp.route('/resources/<string:uid>', methods=['DELETE'])
+@bp.route('/resources/<key:uid>', methods=['DELETE'])
 @bp.doc(summary='Remove a resource',
         description='Remove a resource owned by the authenticated user',
         security=[{'openId': ['mpaflask-write']}])
@@ -119,32 +524,112 @@ def remove_resource(uid: str):
     #(client_id, name) = _extract_identity()
     resource = db.session.get(Resource, uid)
     if not resource:
-        return status_schema.dump(Status(code=410, msg='The resource was already gone')), 410
+        return status_response(410, 'The resource was already gone')
+    if _precondition_failed(resource):
+        return status_response(412, 'The resource was modified')
     db.session.delete(resource)
     db.session.commit()
+    caches()['resources'].invalidate(uid)
+    caches()['owner_counts'].clear()
     return {}, 204
 
 @bp.route('/owners', methods=['GET'])
 @bp.doc(summary='Get all owners',
-        description='Get all currently known owners',
+        description='Get currently known owners, one page at a time in the order of their owner id. '
+                    'Follow the Link header to retrieve the next page. The number of resources of each owner '
+                    'is counted along with the page when asked for',
         security=[{'openId': ['mpaflask-read']}])
-@bp.response(200, schema=OwnerSchema(many=True))
-def get_owners():
+@bp.arguments(OwnerPageInputSchema,
+              location='query',
+              required=False,
+              description='Pagination of the owners')
+@bp.response(200, schema=OwnerSchema(many=True), headers=PAGE_LINK_HEADER)
+@bp.alt_response(200,
+                 schema=OwnerSchema,
+                 content_type=NDJSON_MIMETYPE,
+                 description='All remaining owners, one per line',
+                 success=True)
+def get_owners(page: OwnerPageInput):
     #(client_id, name) = _extract_identity()
-    owners = db.session.query(Owner).all()
-    return owners_schema.dump([Owner(uid=r.uid, name=r.name) for r in owners]), 200
+    if page.with_counts:
+        query = db.session.query(*OWNER_COLUMNS, func.count(Resource.uid).label('resource_count')) \
+            .outerjoin(Resource, Resource.owner_uid == Owner.uid) \
+            .group_by(*OWNER_COLUMNS)
+    else:
+        query = db.session.query(*OWNER_COLUMNS)
+    if _wants_stream(page):
+        return _stream(query, Owner.uid, page, owner_schema)
+    if page.with_counts:
+        owners, headers = caches()['owner_counts'].get_or_load(
+            (page.after, page.limit), lambda: _keyset_page(query, Owner.uid, page))
+    else:
+        owners, headers = _keyset_page(query, Owner.uid, page)
+    return owners, 200, headers
 
-@bp.route('/owners/<string:uid>', methods=['GET'])
+@bp.route('/owners/<key:uid>', methods=['GET'])
 @bp.doc(summary='Get a single owner',
-        description='Return a single owner identified by its owner id',
+        description='Return a single owner identified by its owner id. When its resources are included they are '
+                    'loaded along with the owner in exactly two queries',
         security=[{'openId': ['mpaflask-read']}])
-@bp.response(200, schema=OwnerSchema)
-def get_owner(uid: str):
+@bp.arguments(OwnerIncludeInputSchema,
+              location='query',
+              required=False,
+              description='Related entities to include')
+@bp.response(200, schema=OwnerDocumentSchema, headers=ETAG_HEADER)
+def get_owner(include: OwnerIncludeInput, uid: str):
     #(client_id, name) = _extract_identity()
-    owner = db.session.get(Owner, uid)
+    if include.include == 'resources':
+        owner = db.session.get(Owner, uid, options=[selectinload(Owner.resources)])
+        if not owner:
+            return status_response(404, 'No such owner')
+        return owner, 200
+    not_modified = _not_modified(Owner, caches()['owners'], uid)
+    if not_modified:
+        return not_modified
+    owner = caches()['owners'].get_or_load(
+        uid, lambda: db.session.query(*OWNER_COLUMNS).filter(Owner.uid == uid).first())
     if not owner:
-        return status_schema.dump(Status(code=404, msg='No such owner')), 404
-    return owner_schema.dump(owner), 200
+        return status_response(404, 'No such owner')
+    return owner, 200, _etag_headers(owner.version)
+
+@bp.route('/owners/<key:uid>/resources', methods=['GET'])
+@bp.doc(summary='Get the resources of an owner',
+        description='Returns the resources of a single owner, one page at a time in the order of their resource id. '
+                    'Follow the Link header to retrieve the next page',
+        security=[{'openId': ['mpaflask-read']}])
+@bp.arguments(PageInputSchema,
+              location='query',
+              required=False,
+              description='Pagination of the resources')
+@bp.response(200, schema=ResourceSchema(many=True), headers=PAGE_LINK_HEADER)
+@bp.alt_response(200,
+                 schema=ResourceSchema,
+                 content_type=NDJSON_MIMETYPE,
+                 description='All remaining resources of the owner, one per line',
+                 success=True)
+def get_owner_resources(page: PageInput, uid: str):
+    #(client_id, name) = _extract_identity()
+    if db.session.scalar(select(Owner.uid).where(Owner.uid == uid)) is None:
+        return status_response(404, 'No such owner')
+    query = db.session.query(*RESOURCE_COLUMNS).filter(Resource.owner_uid == uid)
+    if _wants_stream(page):
+        return _stream(query, Resource.uid, page, resource_schema)
+    resources, headers = _keyset_page(query, Resource.uid, page)
+    return resources, 200, headers
+
+@bp.route('/owners:lookup', methods=['POST'])
+@bp.doc(summary='Get many owners',
+        description='Return the owners identified by a list of owner ids along with the ids that were not found',
+        security=[{'openId': ['mpaflask-read']}])
+@bp.arguments(LookupInputSchema,
+              location='json',
+              required=True,
+              description='The owner ids to look up')
+@bp.response(200, schema=OwnerLookupSchema)
+def lookup_owners(data: LookupInput):
+    #(client_id, name) = _extract_identity()
+    owners, missing = _lookup(OWNER_COLUMNS, Owner.uid, data.uids)
+    return OwnerLookup(owners=owners, missing=missing), 200
 
 @bp.route('/owners', methods=['POST'])
 @bp.doc(summary='Create an owner',
@@ -154,15 +639,37 @@ def get_owner(uid: str):
               location='json',
               required=True,
               description='The owner to create')
-@bp.response(201, schema=OwnerSchema)
+@bp.response(201, schema=OwnerSchema, headers=ETAG_HEADER)
 def create_owner(data: OwnerInput):
     #(client_id, name) = _extract_identity()
-    owner = Owner(uid=str(uuid.uuid4()), name=data.name)
+    owner = Owner(uid=new_key(), name=data.name)
     db.session.add(owner)
     db.session.commit()
-    return owner_schema.dump(owner), 201
+    caches()['owners'].invalidate(owner.uid)
+    caches()['owner_counts'].clear()
+    return owner, 201, _etag_headers(owner.version)
+
+@bp.route('/owners:batch', methods=['POST'])
+@bp.doc(summary='Create owners in bulk',
+        description='Create many owners within a single transaction',
+        security=[{'openId': ['mpaflask-write']}])
+@bp.arguments(OwnerInputSchema(many=True),
+              location='json',
+              required=True,
+              description='The owners to create')
+@bp.response(200, schema=BatchResultSchema)
+def create_owners(data: list[OwnerInput]):
+    #(client_id, name) = _extract_identity()
+    rows = [{'uid': new_key(), 'name': item.name} for item in data]
+    _bulk_insert(Owner, rows)
+    db.session.commit()
+    caches()['owners'].invalidate(*[row['uid'] for row in rows])
+    caches()['owner_counts'].clear()
+    return BatchResult(created=len(rows),
+                       failed=0,
+                       items=[BatchItemStatus(code=201, msg='Created', uid=row['uid']) for row in rows]), 200
 
-@bp.route('/owners/<string:uid>', methods=['PUT'])
+@bp.route('/owners/<key:uid>', methods=['PUT'])
 @bp.doc(summary='Modify an owner',
         description='Modify an owner',
         security=[{'openId': ['mpaflask-write']}])
@@ -170,18 +677,22 @@ def create_owner(data: OwnerInput):
               location='json',
               required=True,
               description='The owner with updated contents')
-@bp.response(200, schema=OwnerSchema)
+@bp.response(200, schema=OwnerSchema, headers=ETAG_HEADER)
 def modify_owner(data: OwnerInput, uid: str):
     #(client_id, name) = _extract_identity()
     owner = db.session.get(Owner, uid)
     if not owner:
-        return status_schema.dump(Status(code=404, msg='No such owner')), 404
+        return status_response(404, 'No such owner')
+    if _precondition_failed(owner):
+        return status_response(412, 'The owner was modified')
     owner.name = data.name
     db.session.add(owner)
     db.session.commit()
-    return owner_schema.dump(owner), 200
+    caches()['owners'].invalidate(uid)
+    caches()['owner_counts'].clear()
+    return owner, 200, _etag_headers(owner.version)
 
-@bp.route('/owners/<string:uid>', methods=['DELETE'])
+@bp.route('/owners/<key:uid>', methods=['DELETE'])
 @bp.doc(summary='Remove an owner',
         description='Remove an owner',
         security=[{'openId': ['mpaflask-write']}])
@@ -189,7 +700,11 @@ def remove_owner(uid: str):
     #(client_id, name) = _extract_identity()
     owner = db.session.get(Owner, uid)
     if not owner:
-        return status_schema.dump(Status(code=410, msg='The owner was already gone')), 410
+        return status_response(410, 'The owner was already gone')
+    if _precondition_failed(owner):
+        return status_response(412, 'The owner was modified')
     db.session.delete(owner)
     db.session.commit()
+    caches()['owners'].invalidate(uid)
+    caches()['owner_counts'].clear()
     return {}, 204
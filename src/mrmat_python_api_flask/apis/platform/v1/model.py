@@ -21,45 +21,93 @@
 #  SOFTWARE.
 import dataclasses
 
-from marshmallow import fields, post_load
-from sqlalchemy import String, ForeignKey, UniqueConstraint
+from marshmallow import fields, post_load, validate
+from sqlalchemy import Integer, String, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from mrmat_python_api_flask import ma, ORMBase
+from mrmat_python_api_flask.keys import UUIDKey, canonical_key
+from mrmat_python_api_flask.serializer import CompiledDumpMixin
+from mrmat_python_api_flask.apis import StatusSchema, PageInput, PageInputSchema
 
 
 class Owner(ORMBase):
     __tablename__ = 'owners'
     __schema__ = 'mrmat-python-api-flask'
-    uid: Mapped[str] = mapped_column(String, primary_key=True)
+    uid: Mapped[str] = mapped_column(UUIDKey, primary_key=True)
 
     client_id: Mapped[str] = mapped_column(String(255), nullable=True, unique=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
     resources: Mapped[list["Resource"]] = relationship('Resource', back_populates='owner')
+    __mapper_args__ = {'version_id_col': version}
 
 class Resource(ORMBase):
     __tablename__ = 'resources'
     __schema__ = 'mrmat-python-api-flask'
-    uid: Mapped[str] = mapped_column(String, primary_key=True)
-    owner_uid: Mapped[str] = mapped_column(String, ForeignKey('owners.uid'), nullable=False)
+    uid: Mapped[str] = mapped_column(UUIDKey, primary_key=True)
+    owner_uid: Mapped[str] = mapped_column(UUIDKey, ForeignKey('owners.uid'), nullable=False)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
 
     owner: Mapped["Owner"] = relationship('Owner', back_populates='resources')
-    __table_args__ = (UniqueConstraint('owner_uid', 'name', name='no_duplicate_names_per_owner'),)
+    __table_args__ = (UniqueConstraint('owner_uid', 'name', name='no_duplicate_names_per_owner'),
+                      Index('ix_resources_owner_uid_uid', 'owner_uid', 'uid'))
+    __mapper_args__ = {'version_id_col': version}
 
 
-class OwnerSchema(ma.SQLAlchemyAutoSchema):
+class OwnerSchema(CompiledDumpMixin, ma.SQLAlchemyAutoSchema):
     class Meta:
         model = Owner
+        exclude = ('version',)
 
     uid = ma.auto_field()
     client_id = ma.auto_field()
     name = ma.auto_field()
+    resource_count = fields.Int(
+        dump_only=True,
+        metadata={
+            'description': 'The number of resources of the owner, only present when asked for'
+        })
 
     @post_load
     def as_object(self, data, **kwargs):
         return Owner(**data)
 
+@dataclasses.dataclass
+class OwnerPageInput(PageInput):
+    with_counts: bool = dataclasses.field(default=False)
+
+class OwnerPageInputSchema(PageInputSchema):
+    with_counts = fields.Bool(
+        required=False,
+        load_default=False,
+        metadata={
+            'description': 'Include the number of resources of each owner'
+        })
+
+    @post_load
+    def as_object(self, data, **kwargs) -> OwnerPageInput:
+        page = super().as_object(data, **kwargs)
+        return OwnerPageInput(**dataclasses.asdict(page), with_counts=data['with_counts'])
+
+@dataclasses.dataclass
+class OwnerIncludeInput:
+    include: str | None = dataclasses.field(default=None)
+
+class OwnerIncludeInputSchema(ma.Schema):
+    include = fields.Str(
+        required=False,
+        load_default=None,
+        validate=validate.OneOf(['resources']),
+        metadata={
+            'description': 'Set to resources to include the resources of the owner'
+        })
+
+    @post_load
+    def as_object(self, data, **kwargs) -> OwnerIncludeInput:
+        return OwnerIncludeInput(**data)
+
 @dataclasses.dataclass
 class OwnerInput:
     name: str
@@ -75,10 +123,11 @@ class OwnerInputSchema(ma.Schema):
     def as_object(self, data, **kwargs):
         return OwnerInput(**data)
 
-class ResourceSchema(ma.SQLAlchemyAutoSchema):
+class ResourceSchema(CompiledDumpMixin, ma.SQLAlchemyAutoSchema):
     class Meta:
         model = Resource
         include_fk = True
+        exclude = ('version',)
     uid = ma.auto_field()
     owner_uid = ma.auto_field()
     name = ma.auto_field()
@@ -87,6 +136,17 @@ class ResourceSchema(ma.SQLAlchemyAutoSchema):
     def as_object(self, data, **kwargs):
         return Resource(**data)
 
+class OwnerDocumentSchema(OwnerSchema):
+    """
+    An owner, optionally along with its resources
+    """
+    resources = fields.List(
+        fields.Nested(ResourceSchema),
+        required=False,
+        metadata={
+            'description': 'The resources of the owner, only present when they were asked to be included'
+        })
+
 @dataclasses.dataclass
 class ResourceInput:
     name: str
@@ -106,10 +166,190 @@ class ResourceInputSchema(ma.Schema):
 
     @post_load
     def as_object(self, data, **kwargs):
-        return ResourceInput(**data)
+        return ResourceInput(name=data['name'], owner_uid=canonical_key(data['owner_uid']))
+@dataclasses.dataclass
+class BatchItemStatus:
+    code: int
+    msg: str
+    uid: str | None = None
+
+class BatchItemStatusSchema(StatusSchema):
+    uid = fields.Str(
+        required=False,
+        load_default=None,
+        metadata={
+            'description': 'The id of the created item, absent when it was not created'
+        })
+
+    @post_load
+    def as_object(self, data, **kwargs) -> BatchItemStatus:
+        return BatchItemStatus(**data)
+
+@dataclasses.dataclass
+class BatchResult:
+    created: int
+    failed: int
+    items: list[BatchItemStatus]
+
+class BatchResultSchema(ma.Schema):
+    created = fields.Int(
+        required=True,
+        metadata={
+            'description': 'The number of items created'
+        })
+    failed = fields.Int(
+        required=True,
+        metadata={
+            'description': 'The number of items not created'
+        })
+    items = fields.List(
+        fields.Nested(BatchItemStatusSchema),
+        required=True,
+        metadata={
+            'description': 'The outcome for each submitted item, in the order they were submitted'
+        })
+
+    @post_load
+    def as_object(self, data, **kwargs) -> BatchResult:
+        return BatchResult(**data)
+
+@dataclasses.dataclass
+class ImportItemStatus:
+    line: int
+    code: int
+    msg: str
+
+class ImportItemStatusSchema(StatusSchema):
+    line = fields.Int(
+        required=True,
+        metadata={
+            'description': 'The line of the upload on which the record starts, counting from 1'
+        })
+
+    @post_load
+    def as_object(self, data, **kwargs) -> ImportItemStatus:
+        return ImportItemStatus(**data)
+
+@dataclasses.dataclass
+class ImportResult:
+    records: int = 0
+    created: int = 0
+    failed: int = 0
+    chunks: int = 0
+    errors: list[ImportItemStatus] = dataclasses.field(default_factory=list)
+    errors_truncated: bool = False
+
+class ImportResultSchema(ma.Schema):
+    records = fields.Int(
+        required=True,
+        metadata={
+            'description': 'The number of records read from the upload'
+        })
+    created = fields.Int(
+        required=True,
+        metadata={
+            'description': 'The number of resources created'
+        })
+    failed = fields.Int(
+        required=True,
+        metadata={
+            'description': 'The number of records not imported'
+        })
+    chunks = fields.Int(
+        required=True,
+        metadata={
+            'description': 'The number of chunks committed'
+        })
+    errors = fields.List(
+        fields.Nested(ImportItemStatusSchema),
+        required=True,
+        metadata={
+            'description': 'The records not imported and why, in the order of the upload'
+        })
+    errors_truncated = fields.Bool(
+        required=True,
+        metadata={
+            'description': 'Whether more records failed than are listed in errors'
+        })
+
+    @post_load
+    def as_object(self, data, **kwargs) -> ImportResult:
+        return ImportResult(**data)
+
+@dataclasses.dataclass
+class LookupInput:
+    uids: list[str]
+
+class LookupInputSchema(ma.Schema):
+    uids = fields.List(
+        fields.Str(),
+        required=True,
+        validate=validate.Length(min=1),
+        metadata={
+            'description': 'The ids to look up'
+        })
+
+    @post_load
+    def as_object(self, data, **kwargs) -> LookupInput:
+        return LookupInput(uids=[canonical_key(uid) for uid in data['uids']])
+
+@dataclasses.dataclass
+class OwnerLookup:
+    owners: list[Owner]
+    missing: list[str]
+
+class OwnerLookupSchema(ma.Schema):
+    owners = fields.List(
+        fields.Nested(OwnerSchema),
+        required=True,
+        metadata={
+            'description': 'The owners found, in the order they were asked for'
+        })
+    missing = fields.List(
+        fields.Str(),
+        required=True,
+        metadata={
+            'description': 'The ids of the owners that were not found'
+        })
+
+    @post_load
+    def as_object(self, data, **kwargs) -> OwnerLookup:
+        return OwnerLookup(**data)
+
+@dataclasses.dataclass
+class ResourceLookup:
+    resources: list[Resource]
+    missing: list[str]
+
+class ResourceLookupSchema(ma.Schema):
+    resources = fields.List(
+        fields.Nested(ResourceSchema),
+        required=True,
+        metadata={
+            'description': 'The resources found, in the order they were asked for'
+        })
+    missing = fields.List(
+        fields.Str(),
+        required=True,
+        metadata={
+            'description': 'The ids of the resources that were not found'
+        })
+
+    @post_load
+    def as_object(self, data, **kwargs) -> ResourceLookup:
+        return ResourceLookup(**data)
+
 owner_schema = OwnerSchema()
 owners_schema = OwnerSchema(many=True)
+owner_document_schema = OwnerDocumentSchema()
+owner_include_input_schema = OwnerIncludeInputSchema()
+owner_page_input_schema = OwnerPageInputSchema()
 owner_input_schema = OwnerInputSchema()
 resource_schema = ResourceSchema()
 resources_schema = ResourceSchema(many=True)
 resource_input_schema = ResourceInputSchema()
+batch_result_schema = BatchResultSchema()
+import_result_schema = ImportResultSchema()
+lookup_input_schema = LookupInputSchema()
+owner_lookup_schema = OwnerLookupSchema()
+resource_lookup_schema = ResourceLookupSchema()
@@ -20,21 +20,12 @@
 #  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 #  SOFTWARE.
 
-from functools import lru_cache
+"""Pluggable blueprint of the Profiling API
+"""
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session, sessionmaker
-
-from mrmat_python_api_flask import app_config, ORMBase
-
-
-@lru_cache
-def get_db() -> Session:
-    if app_config.db_url.startswith('sqlite'):
-        engine = create_engine(url=app_config.db_url, connect_args={'check_same_thread': False})
-    else:
-        engine = create_engine(url=app_config.db_url)
-    session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    with session_local():
-        ORMBase.metadata.create_all(bind=engine)
-    return session_local()
+from .model import (
+    Profile, ProfileSchema, profile_schema,
+    ProfilingSettings, ProfilingSettingsSchema, profiling_settings_schema,
+    ProfileList, ProfileListSchema, profile_list_schema
+)
+from .api import bp as api_profiling
@@ -0,0 +1,85 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Mathieu Imfeld
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+"""
+Blueprint for the Profiling API
+"""
+
+from flask import current_app, request, send_from_directory
+from flask_smorest import Blueprint
+from werkzeug.exceptions import NotFound
+
+from mrmat_python_api_flask.apis import status_response
+from mrmat_python_api_flask.profiling import ProfilingMiddleware, TOKEN_HEADER, verify_token
+
+from .model import (
+    Profile, ProfileList, ProfileListSchema,
+    ProfilingSettings, ProfilingSettingsSchema
+)
+
+bp = Blueprint('profiling', __name__, description='Profiling API')
+
+
+def _profiler() -> ProfilingMiddleware:
+    return current_app.extensions['mrmat_python_api_flask']['profiler']
+
+
+@bp.before_request
+def _require_token():
+    if not verify_token(_profiler().secret_key, request.headers.get(TOKEN_HEADER)):
+        return status_response(401, f'A valid {TOKEN_HEADER} header is required')
+    return None
+
+
+@bp.route('/', methods=['GET'])
+@bp.doc(summary='Get the recent profiles',
+        description='List the profiles written by all workers to the profiling directory, most recent first')
+@bp.response(200, ProfileListSchema)
+def get_profiles() -> ProfileList:
+    profiler = _profiler()
+    return ProfileList(sample_rate=profiler.sample_rate,
+                       profiles=[Profile(**profile) for profile in profiler.profiles()])
+
+
+@bp.route('/settings', methods=['PUT'])
+@bp.doc(summary='Modify the profiling settings',
+        description='Change the share of requests profiled by the worker process answering the request')
+@bp.arguments(ProfilingSettingsSchema,
+              location='json',
+              required=True,
+              description='The profiling settings')
+@bp.response(200, ProfilingSettingsSchema)
+def modify_settings(data: ProfilingSettings) -> ProfilingSettings:
+    _profiler().sample_rate = data.sample_rate
+    return data
+
+
+@bp.route('/<string:name>', methods=['GET'])
+@bp.doc(summary='Download a profile',
+        description='Download a .pstats or .collapsed profile by its name')
+def get_profile(name: str):
+    if not name.endswith(('.pstats', '.collapsed')):
+        return status_response(404, 'No such profile')
+    try:
+        return send_from_directory(_profiler().directory, name, as_attachment=True)
+    except NotFound:
+        return status_response(404, 'No such profile')
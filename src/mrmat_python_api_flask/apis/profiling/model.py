@@ -0,0 +1,96 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Mathieu Imfeld
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+import dataclasses
+from marshmallow import fields, post_load, validate
+
+from mrmat_python_api_flask import ma
+from mrmat_python_api_flask.serializer import CompiledDumpMixin
+
+@dataclasses.dataclass
+class Profile:
+    name: str
+    size: int = dataclasses.field(default=0)
+    created: float = dataclasses.field(default=0.0)
+
+class ProfileSchema(CompiledDumpMixin, ma.Schema):
+    name = fields.Str(
+        required=True,
+        metadata={
+            'description': 'The file name of the profile, .pstats for cProfile or .collapsed for folded stacks'
+        })
+    size = fields.Int(
+        required=True,
+        metadata={
+            'description': 'The size of the profile in bytes'
+        })
+    created = fields.Float(
+        required=True,
+        metadata={
+            'description': 'The time the profile was written, in seconds since the epoch'
+        })
+
+    @post_load
+    def as_object(self, data, **kwargs) -> Profile:
+        return Profile(**data)
+
+@dataclasses.dataclass
+class ProfilingSettings:
+    sample_rate: float = dataclasses.field(default=0.0)
+
+class ProfilingSettingsSchema(CompiledDumpMixin, ma.Schema):
+    sample_rate = fields.Float(
+        required=True,
+        validate=validate.Range(min=0.0, max=1.0),
+        metadata={
+            'description': 'The share of requests profiled without asking for it, between 0 and 1'
+        })
+
+    @post_load
+    def as_object(self, data, **kwargs) -> ProfilingSettings:
+        return ProfilingSettings(**data)
+
+@dataclasses.dataclass
+class ProfileList:
+    sample_rate: float
+    profiles: list[Profile] = dataclasses.field(default_factory=list)
+
+class ProfileListSchema(CompiledDumpMixin, ma.Schema):
+    sample_rate = fields.Float(
+        required=True,
+        metadata={
+            'description': 'The share of requests profiled without asking for it'
+        })
+    profiles = fields.List(
+        fields.Nested(ProfileSchema),
+        required=True,
+        metadata={
+            'description': 'The profiles in the profiling directory, most recent first'
+        })
+
+    @post_load
+    def as_object(self, data, **kwargs) -> ProfileList:
+        return ProfileList(**data)
+
+profile_schema = ProfileSchema()
+profiling_settings_schema = ProfilingSettingsSchema()
+profile_list_schema = ProfileListSchema()
@@ -23,6 +23,19 @@
 import os
 import json
 import secrets
+import tempfile
+
+
+def _as_bool(value: str | bool | None) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def _as_optional_int(value: str | int | None) -> int | None:
+    if value is None or value == '':
+        return None
+    return int(value)
 
 
 class Config:
@@ -31,6 +44,25 @@ class Config:
     """
     secret_key: str = secrets.token_urlsafe(16)
     db_url: str = 'sqlite:///'
+    json_provider: str = 'default'
+    cache_enabled: bool = False
+    cache_size: int = 1024
+    cache_ttl: float = 30.0
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int | None = None
+    db_pool_pre_ping: bool = False
+    db_statement_timeout: int = 0
+    db_sqlite_profile: bool = True
+    metrics_enabled: bool = True
+    db_query_headers: bool = False
+    db_slow_query_ms: float = 500.0
+    db_key_storage: str = 'string'
+    profiling_enabled: bool = False
+    profiling_dir: str = os.path.join(tempfile.gettempdir(), 'mrmat-python-api-flask-profiles')
+    profiling_sample_rate: float = 0.0
+    profiling_keep: int = 50
 
     @staticmethod
     def from_context(file: str | None = os.getenv('APP_CONFIG')):
@@ -40,8 +72,65 @@ class Config:
                 file_config = json.load(c)
             runtime_config.secret_key = file_config.get('secret_key', secrets.token_urlsafe(16))
             runtime_config.db_url = file_config.get('db_url', 'sqlite:///')
+            runtime_config.json_provider = file_config.get('json_provider', 'default')
+            runtime_config.cache_enabled = _as_bool(file_config.get('cache_enabled', False))
+            runtime_config.cache_size = int(file_config.get('cache_size', 1024))
+            runtime_config.cache_ttl = float(file_config.get('cache_ttl', 30.0))
+            runtime_config.db_pool_size = int(file_config.get('db_pool_size', 5))
+            runtime_config.db_max_overflow = int(file_config.get('db_max_overflow', 10))
+            runtime_config.db_pool_timeout = float(file_config.get('db_pool_timeout', 30.0))
+            runtime_config.db_pool_recycle = _as_optional_int(file_config.get('db_pool_recycle'))
+            runtime_config.db_pool_pre_ping = _as_bool(file_config.get('db_pool_pre_ping', False))
+            runtime_config.db_statement_timeout = int(file_config.get('db_statement_timeout', 0))
+            runtime_config.db_sqlite_profile = _as_bool(file_config.get('db_sqlite_profile', True))
+            runtime_config.metrics_enabled = _as_bool(file_config.get('metrics_enabled', True))
+            runtime_config.db_query_headers = _as_bool(file_config.get('db_query_headers', False))
+            runtime_config.db_slow_query_ms = float(file_config.get('db_slow_query_ms', 500.0))
+            runtime_config.db_key_storage = file_config.get('db_key_storage', 'string')
+            runtime_config.profiling_enabled = _as_bool(file_config.get('profiling_enabled', False))
+            runtime_config.profiling_dir = file_config.get('profiling_dir', Config.profiling_dir)
+            runtime_config.profiling_sample_rate = float(file_config.get('profiling_sample_rate', 0.0))
+            runtime_config.profiling_keep = int(file_config.get('profiling_keep', 50))
         if 'APP_CONFIG_SECRET_KEY' in os.environ:
             runtime_config.secret_key = os.getenv('APP_CONFIG_SECRET_KEY', secrets.token_urlsafe(16))
         if 'APP_CONFIG_DB_URL' in os.environ:
             runtime_config.db_url = os.getenv('APP_CONFIG_DB_URL', '')
+        if 'APP_CONFIG_JSON_PROVIDER' in os.environ:
+            runtime_config.json_provider = os.getenv('APP_CONFIG_JSON_PROVIDER', 'default')
+        if 'APP_CONFIG_CACHE_ENABLED' in os.environ:
+            runtime_config.cache_enabled = _as_bool(os.getenv('APP_CONFIG_CACHE_ENABLED'))
+        if 'APP_CONFIG_CACHE_SIZE' in os.environ:
+            runtime_config.cache_size = int(os.getenv('APP_CONFIG_CACHE_SIZE', '1024'))
+        if 'APP_CONFIG_CACHE_TTL' in os.environ:
+            runtime_config.cache_ttl = float(os.getenv('APP_CONFIG_CACHE_TTL', '30.0'))
+        if 'APP_CONFIG_DB_POOL_SIZE' in os.environ:
+            runtime_config.db_pool_size = int(os.getenv('APP_CONFIG_DB_POOL_SIZE', '5'))
+        if 'APP_CONFIG_DB_MAX_OVERFLOW' in os.environ:
+            runtime_config.db_max_overflow = int(os.getenv('APP_CONFIG_DB_MAX_OVERFLOW', '10'))
+        if 'APP_CONFIG_DB_POOL_TIMEOUT' in os.environ:
+            runtime_config.db_pool_timeout = float(os.getenv('APP_CONFIG_DB_POOL_TIMEOUT', '30.0'))
+        if 'APP_CONFIG_DB_POOL_RECYCLE' in os.environ:
+            runtime_config.db_pool_recycle = _as_optional_int(os.getenv('APP_CONFIG_DB_POOL_RECYCLE'))
+        if 'APP_CONFIG_DB_POOL_PRE_PING' in os.environ:
+            runtime_config.db_pool_pre_ping = _as_bool(os.getenv('APP_CONFIG_DB_POOL_PRE_PING'))
+        if 'APP_CONFIG_DB_STATEMENT_TIMEOUT' in os.environ:
+            runtime_config.db_statement_timeout = int(os.getenv('APP_CONFIG_DB_STATEMENT_TIMEOUT', '0'))
+        if 'APP_CONFIG_DB_SQLITE_PROFILE' in os.environ:
+            runtime_config.db_sqlite_profile = _as_bool(os.getenv('APP_CONFIG_DB_SQLITE_PROFILE'))
+        if 'APP_CONFIG_METRICS_ENABLED' in os.environ:
+            runtime_config.metrics_enabled = _as_bool(os.getenv('APP_CONFIG_METRICS_ENABLED'))
+        if 'APP_CONFIG_DB_QUERY_HEADERS' in os.environ:
+            runtime_config.db_query_headers = _as_bool(os.getenv('APP_CONFIG_DB_QUERY_HEADERS'))
+        if 'APP_CONFIG_DB_SLOW_QUERY_MS' in os.environ:
+            runtime_config.db_slow_query_ms = float(os.getenv('APP_CONFIG_DB_SLOW_QUERY_MS', '500.0'))
+        if 'APP_CONFIG_DB_KEY_STORAGE' in os.environ:
+            runtime_config.db_key_storage = os.getenv('APP_CONFIG_DB_KEY_STORAGE', 'string')
+        if 'APP_CONFIG_PROFILING_ENABLED' in os.environ:
+            runtime_config.profiling_enabled = _as_bool(os.getenv('APP_CONFIG_PROFILING_ENABLED'))
+        if 'APP_CONFIG_PROFILING_DIR' in os.environ:
+            runtime_config.profiling_dir = os.getenv('APP_CONFIG_PROFILING_DIR', Config.profiling_dir)
+        if 'APP_CONFIG_PROFILING_SAMPLE_RATE' in os.environ:
+            runtime_config.profiling_sample_rate = float(os.getenv('APP_CONFIG_PROFILING_SAMPLE_RATE', '0.0'))
+        if 'APP_CONFIG_PROFILING_KEEP' in os.environ:
+            runtime_config.profiling_keep = int(os.getenv('APP_CONFIG_PROFILING_KEEP', '50'))
         return runtime_config
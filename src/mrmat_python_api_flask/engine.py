@@ -0,0 +1,199 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Mathieu Imfeld
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+"""
+Engine and connection pool options shared by every engine the application creates
+"""
+
+import threading
+import time
+import typing
+
+import sqlalchemy.event
+import sqlalchemy.exc
+import sqlalchemy.pool
+from sqlalchemy.engine import Engine, make_url
+
+from .config import Config
+from .keys import set_key_storage
+
+#: Pragmas applied to every new SQLite connection when the SQLite profile is enabled. WAL lets readers proceed
+#: while a writer commits, and NORMAL synchronisation is durable in WAL mode except across power loss
+SQLITE_PRAGMAS: dict[str, typing.Any] = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 268435456,
+    'cache_size': -65536,
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY'
+}
+
+
+class InstrumentedQueuePool(sqlalchemy.pool.QueuePool):
+    """
+    A QueuePool which keeps track of how often and for how long callers had to wait for a connection
+
+    The wait covers the time spent in the pool until a connection was handed out, including opening a new
+    connection when the pool was not yet full or overflowing. Checkouts that timed out are counted separately.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except sqlalchemy.exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        waited = time.perf_counter() - start
+        with self._stats_lock:
+            self.checkouts += 1
+            self.wait_time_total += waited
+            self.wait_time_max = max(self.wait_time_max, waited)
+        return connection
+
+
+def is_memory_sqlite(db_url: str) -> bool:
+    """
+    Whether db_url is a private in-memory SQLite database, which only exists on its single connection
+    """
+    url = make_url(db_url)
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def is_shared_memory_sqlite(db_url: str) -> bool:
+    """
+    Whether db_url is an in-memory SQLite database shared by the connections of a process
+    """
+    url = make_url(db_url)
+    return url.get_backend_name() == 'sqlite' and url.query.get('mode') == 'memory' \
+        and url.query.get('cache') == 'shared'
+
+
+def engine_options(config: Config) -> dict[str, typing.Any]:
+    """
+    Return the keyword arguments to create an engine for config.db_url with
+
+    In-memory SQLite databases live and die with their single connection, so they get the static pool they
+    must use and no pool sizing. A shared in-memory database is pooled with a single connection, because its
+    shared cache refuses concurrent writers with SQLITE_LOCKED, which the busy timeout does not retry. The statement
+    timeout is applied by the server for PostgreSQL and MySQL and is not
+    available for SQLite.
+    """
+    if is_memory_sqlite(config.db_url):
+        return {'poolclass': sqlalchemy.pool.StaticPool, 'connect_args': {'check_same_thread': False}}
+    options: dict[str, typing.Any] = {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': config.db_pool_size,
+        'max_overflow': config.db_max_overflow,
+        'pool_timeout': config.db_pool_timeout,
+        'pool_pre_ping': config.db_pool_pre_ping
+    }
+    if make_url(config.db_url).get_backend_name() == 'sqlite':
+        options['connect_args'] = {'check_same_thread': False}
+    if is_shared_memory_sqlite(config.db_url):
+        options.update(pool_size=1, max_overflow=0)
+    if config.db_pool_recycle is not None:
+        options['pool_recycle'] = config.db_pool_recycle
+    if config.db_statement_timeout:
+        backend = make_url(config.db_url).get_backend_name()
+        if backend == 'postgresql':
+            options['connect_args'] = {'options': f'-c statement_timeout={config.db_statement_timeout}'}
+        elif backend in ('mysql', 'mariadb'):
+            options['connect_args'] = {
+                'init_command': f'SET SESSION max_execution_time={config.db_statement_timeout}'
+            }
+    return options
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+    finally:
+        cursor.close()
+
+
+def configure_engine(engine: Engine, config: Config):
+    """
+    Choose how the engine stores keys and install the SQLite profile on an engine that has not connected yet,
+    and keep a shared in-memory database alive for as long as the engine exists
+
+    A shared in-memory database is dropped by SQLite once its last connection closes. Since pooled connections
+    come and go, one connection outside of the pool is held open for the lifetime of the engine.
+    """
+    set_key_storage(engine, config.db_key_storage)
+    if engine.dialect.name != 'sqlite':
+        return
+    if config.db_sqlite_profile:
+        sqlalchemy.event.listen(engine, 'connect', _apply_sqlite_pragmas)
+    if is_shared_memory_sqlite(str(engine.url)):
+        cargs, cparams = engine.dialect.create_connect_args(engine.url)
+        engine.shared_memory_anchor = engine.dialect.connect(*cargs, **cparams)
+
+
+def dispose_after_fork(engine: Engine):
+    """
+    Make a forked process open its own connections rather than share those inherited from its parent, which
+    keeps using them. An in-memory SQLite database only exists on its single connection and is kept as it is
+    """
+    if not isinstance(engine.pool, sqlalchemy.pool.StaticPool):
+        engine.dispose(close=False)
+
+
+def pool_stats(pool: sqlalchemy.pool.Pool) -> dict[str, typing.Any]:
+    """
+    Return a snapshot of the state of pool. Sizes are only known for queue pools and wait times only for
+    the instrumented one, everything unknown is None
+    """
+    stats: dict[str, typing.Any] = {
+        'pool': type(pool).__name__,
+        'size': None,
+        'checked_out': None,
+        'checked_in': None,
+        'overflow': None,
+        'checkouts': None,
+        'timeouts': None,
+        'wait_time_total': None,
+        'wait_time_max': None
+    }
+    if isinstance(pool, sqlalchemy.pool.QueuePool):
+        stats.update(size=pool.size(),
+                     checked_out=pool.checkedout(),
+                     checked_in=pool.checkedin(),
+                     overflow=pool.overflow())
+    if isinstance(pool, InstrumentedQueuePool):
+        with pool._stats_lock:
+            stats.update(checkouts=pool.checkouts,
+                         timeouts=pool.timeouts,
+                         wait_time_total=pool.wait_time_total,
+                         wait_time_max=pool.wait_time_max)
+    return stats
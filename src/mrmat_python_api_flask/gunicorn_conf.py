@@ -0,0 +1,167 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Mathieu Imfeld
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+"""
+Gunicorn configuration sized to the CPUs available to the container
+
+Use it with
+
+    gunicorn -c python:mrmat_python_api_flask.gunicorn_conf mrmat_python_api_flask:app
+
+Every setting can be overridden through the environment or on the command line. The number of CPUs honours
+the CPU affinity of the process and the CFS quota of its cgroup, so a pod limited to two CPUs on a large node
+gets workers for two CPUs rather than for the whole node.
+
+An in-memory SQLite database exists once per worker process, so it is served by a single worker whatever is
+configured. The default sqlite:/// database additionally lives on a single connection, which only a sync worker
+serving one request at a time can use safely.
+"""
+
+import glob
+import math
+import os
+import tempfile
+
+from mrmat_python_api_flask.config import Config
+from mrmat_python_api_flask.engine import is_memory_sqlite, is_shared_memory_sqlite
+
+WORKER_CLASSES = ('sync', 'gthread', 'gevent')
+
+
+def _cgroup_cpu_limit(root: str = '/sys/fs/cgroup') -> float | None:
+    """
+    Return the CPU limit of the cgroup we run in, or None when there is none. Both cgroup v2 and v1 are understood
+    """
+    try:
+        with open(os.path.join(root, 'cpu.max'), 'r', encoding='UTF-8') as f:
+            quota, period = f.read().split()[:2]
+        if quota != 'max':
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+    try:
+        with open(os.path.join(root, 'cpu', 'cpu.cfs_quota_us'), 'r', encoding='UTF-8') as f:
+            quota = int(f.read())
+        with open(os.path.join(root, 'cpu', 'cpu.cfs_period_us'), 'r', encoding='UTF-8') as f:
+            period = int(f.read())
+        if quota > 0 and period > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def available_cpus() -> int:
+    """
+    Return the number of CPUs this process may use, at least one
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    limit = _cgroup_cpu_limit()
+    if limit is not None:
+        cpus = min(cpus, math.ceil(limit))
+    return max(cpus, 1)
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name, '')
+    return int(value) if value.strip() else default
+
+
+cpus = available_cpus()
+
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+if worker_class not in WORKER_CLASSES:
+    raise ValueError(f'GUNICORN_WORKER_CLASS must be one of {", ".join(WORKER_CLASSES)}, not {worker_class}')
+
+# Sync workers block on every request and need the most processes. Threaded and gevent workers overlap
+# requests waiting on the database within a process, so one process per CPU keeps them all busy
+if worker_class == 'sync':
+    workers = _env_int('WEB_CONCURRENCY', 2 * cpus + 1)
+    threads = 1
+elif worker_class == 'gthread':
+    workers = _env_int('WEB_CONCURRENCY', cpus + 1)
+    threads = _env_int('GUNICORN_THREADS', 4)
+else:
+    workers = _env_int('WEB_CONCURRENCY', cpus)
+    threads = 1
+    worker_connections = _env_int('GUNICORN_WORKER_CONNECTIONS', 1000)
+
+# Requests served by different workers would see different in-memory databases
+db_url = Config.from_context(os.getenv('APP_CONFIG')).db_url
+if is_memory_sqlite(db_url) or is_shared_memory_sqlite(db_url):
+    workers = 1
+if is_memory_sqlite(db_url):
+    worker_class, threads = 'sync', 1
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+preload_app = os.getenv('GUNICORN_PRELOAD', 'false').strip().lower() in ('1', 'true', 'yes', 'on')
+keepalive = _env_int('GUNICORN_KEEPALIVE', 5)
+timeout = _env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 0)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', max_requests // 10)
+# Heartbeat files on a memory filesystem do not stall workers when the container disk is slow
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+accesslog = os.getenv('GUNICORN_ACCESSLOG', None)
+
+# Workers record their metrics in files of a directory shared with each other, which prometheus_client must know
+# about before it is first imported by the master when preloading or by the workers
+if not os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = tempfile.mkdtemp(prefix='mpaflask-metrics-')
+
+
+def on_starting(server):
+    """
+    Discard the metrics of a previous run when the metrics directory is reused
+    """
+    for path in glob.glob(os.path.join(os.environ['PROMETHEUS_MULTIPROC_DIR'], '*.db')):
+        os.remove(path)
+
+
+def child_exit(server, worker):
+    """
+    Stop reporting the live gauges of a worker that is gone
+    """
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:                                                             # pragma: no cover
+        return
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def post_fork(server, worker):
+    """
+    Drop the pooled connections a worker inherited from the master, which would otherwise be shared by every
+    worker forked from it. Without preloading the app is only created after the fork and has none
+    """
+    import mrmat_python_api_flask
+    from mrmat_python_api_flask.engine import dispose_after_fork
+    from mrmat_python_api_flask.sessions import dispose_engines
+    app = vars(mrmat_python_api_flask).get('app')
+    if app is not None:
+        with app.app_context():
+            dispose_after_fork(mrmat_python_api_flask.db.engine)
+    dispose_engines(after_fork=True)
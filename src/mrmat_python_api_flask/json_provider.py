@@ -0,0 +1,91 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Mathieu Imfeld
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+"""
+Selectable JSON providers for the Flask app
+
+The default provider is the one Flask ships with, based on the standard library json module. The orjson provider
+encodes and decodes several times faster and is used when it is configured and the orjson package is installed.
+"""
+
+import datetime
+import decimal
+import typing
+
+import flask
+from flask.json.provider import JSONProvider, DefaultJSONProvider
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:                                                                 # pragma: no cover
+    orjson = None
+
+
+def _default(o: typing.Any) -> typing.Any:
+    """
+    Serialize what orjson does not, the same way as the default Flask provider does
+    """
+    if isinstance(o, datetime.date):
+        return http_date(o)
+    if isinstance(o, decimal.Decimal):
+        return str(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
+
+
+class OrjsonProvider(JSONProvider):
+    """
+    A JSON provider backed by orjson. Keys are sorted like the default provider does. Dates are formatted as HTTP
+    dates like the default provider does, rather than the ISO 8601 format orjson uses natively.
+    """
+    mimetype = 'application/json'
+    option = 0 if orjson is None else orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def dumps(self, obj: typing.Any, **kwargs: typing.Any) -> str:
+        return orjson.dumps(obj, default=_default, option=self.option).decode('utf-8')
+
+    def loads(self, s: str | bytes, **kwargs: typing.Any) -> typing.Any:
+        return orjson.loads(s)
+
+    def response(self, *args: typing.Any, **kwargs: typing.Any) -> flask.Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        option = self.option | orjson.OPT_APPEND_NEWLINE
+        if self._app.debug:
+            option |= orjson.OPT_INDENT_2
+        return self._app.response_class(orjson.dumps(obj, default=_default, option=option),
+                                        mimetype=self.mimetype)
+
+
+def create_json_provider(app: flask.Flask, name: str) -> JSONProvider:
+    """
+    Create the JSON provider selected by name, falling back to the default provider when it is not available
+    """
+    if name == 'orjson':
+        if orjson is not None:
+            return OrjsonProvider(app)
+        app.logger.warning('The orjson JSON provider is configured but orjson is not installed, '
+                           'falling back to the default JSON provider')
+    elif name != 'default':
+        app.logger.warning('Unknown JSON provider %s, falling back to the default JSON provider', name)
+    return DefaultJSONProvider(app)
@@ -0,0 +1,141 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Mathieu Imfeld
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+"""
+Primary keys of the platform entities
+
+Keys are UUIDv7, whose leading 48 bits are the creation time in milliseconds. New keys therefore sort after
+the existing ones and are appended to the right edge of the primary key B-tree instead of landing on random
+pages. The API exchanges keys as canonical UUID strings. In the database they are stored as
+
+* string: the 36 character string, the original layout
+* native: the native UUID type where the database has one, such as PostgreSQL, and 32 hex characters elsewhere
+* binary: the 16 bytes of the UUID
+
+The storage is chosen per engine by configure_engine, before the engine is used.
+"""
+
+import os
+import threading
+import time
+import uuid
+
+import sqlalchemy
+import sqlalchemy.types
+import werkzeug.routing
+
+KEY_STORAGES = ('string', 'native', 'binary')
+
+_uuid7_lock = threading.Lock()
+_uuid7_last = (0, 0)
+
+
+def uuid7() -> uuid.UUID:
+    """
+    Create a UUIDv7. Keys created within the same millisecond by this process count up in the 12 bits following
+    the timestamp, so they still sort in creation order
+    """
+    global _uuid7_last
+    with _uuid7_lock:
+        millis = time.time_ns() // 1_000_000
+        last_millis, counter = _uuid7_last
+        if millis > last_millis:
+            counter = int.from_bytes(os.urandom(2), 'big') & 0x7ff
+        else:
+            millis, counter = last_millis, counter + 1
+            if counter > 0xfff:
+                millis, counter = millis + 1, 0
+        _uuid7_last = (millis, counter)
+    value = (millis & 0xffffffffffff) << 80 | 0x7 << 76 | counter << 64 \
+        | 0b10 << 62 | int.from_bytes(os.urandom(8), 'big') & 0x3fffffffffffffff
+    return uuid.UUID(int=value)
+
+
+def new_key() -> str:
+    return str(uuid7())
+
+
+def canonical_key(value: str) -> str:
+    """
+    Return the canonical lowercase string of a UUID given in any form uuid.UUID accepts, or value itself when it
+    is not a UUID. Ids are compared in this form, since the compact key storages match every form of a UUID
+    """
+    try:
+        return str(uuid.UUID(value))
+    except (TypeError, ValueError):
+        return value
+
+
+class KeyConverter(werkzeug.routing.BaseConverter):
+    """
+    A URL converter passing the key in a path segment to its view in canonical form, registered as 'key'
+    """
+
+    def to_python(self, value: str) -> str:
+        return canonical_key(value)
+
+
+def set_key_storage(engine: sqlalchemy.Engine, storage: str):
+    """
+    Store the keys of the tables used through engine as storage, one of KEY_STORAGES
+    """
+    if storage not in KEY_STORAGES:
+        raise ValueError(f'Unknown key storage {storage}, expected one of {", ".join(KEY_STORAGES)}')
+    engine.dialect.key_storage = storage
+
+
+def key_storage(dialect: sqlalchemy.Dialect) -> str:
+    return getattr(dialect, 'key_storage', 'string')
+
+
+class UUIDKey(sqlalchemy.types.TypeDecorator):
+    """
+    A UUID key, exchanged as a string and stored as the key storage of the dialect asks for. In the compact
+    storages values that are not UUIDs are bound as NULL, so looking them up finds nothing
+    """
+    impl = sqlalchemy.String
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect: sqlalchemy.Dialect) -> sqlalchemy.types.TypeEngine:
+        storage = key_storage(dialect)
+        if storage == 'native':
+            return dialect.type_descriptor(sqlalchemy.Uuid(as_uuid=False))
+        if storage == 'binary':
+            if dialect.name in ('mysql', 'mariadb'):
+                return dialect.type_descriptor(sqlalchemy.BINARY(16))
+            return dialect.type_descriptor(sqlalchemy.LargeBinary(16))
+        return dialect.type_descriptor(sqlalchemy.String())
+
+    def process_bind_param(self, value, dialect: sqlalchemy.Dialect):
+        storage = key_storage(dialect)
+        if value is None or storage == 'string':
+            return value
+        try:
+            key = value if isinstance(value, uuid.UUID) else uuid.UUID(value)
+        except (TypeError, ValueError):
+            return None
+        return key.bytes if storage == 'binary' else str(key)
+
+    def process_result_value(self, value, dialect: sqlalchemy.Dialect):
+        if value is None or key_storage(dialect) != 'binary':
+            return value
+        return str(uuid.UUID(bytes=bytes(value)))
@@ -0,0 +1,169 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Mathieu Imfeld
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+"""
+Prometheus metrics of the app, served at /metrics when prometheus_client is installed
+
+Every request is timed by blueprint, endpoint, method and status, and the count of that histogram is the request
+count. SQL statements and response serialization are timed as well, and the counters of the entity caches are
+exported after every request. When PROMETHEUS_MULTIPROC_DIR is set before
+the metrics are first imported, every process records its samples in that directory and a scrape of any one
+worker reports the sum over all of them. The packaged gunicorn configuration sets this up.
+"""
+
+import os
+import threading
+import time
+import weakref
+
+import flask
+from sqlalchemy import Engine
+
+from . import serializer
+from .cache import EntityCache
+from .query_timing import observe_statements
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+except ImportError:                                                                 # pragma: no cover
+    prometheus_client = None
+
+NAMESPACE = 'mpaflask'
+LATENCY_BUCKETS = (.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1.0, 2.5, 5.0, 10.0)
+
+#: Whether samples are shared between processes, decided by prometheus_client when it is first imported
+MULTIPROCESS = 'PROMETHEUS_MULTIPROC_DIR' in os.environ
+
+if prometheus_client is not None:
+    REQUEST_LATENCY = prometheus_client.Histogram('http_request_duration_seconds',
+                                                  'Seconds from receiving a request until its response was built',
+                                                  ['blueprint', 'endpoint', 'method', 'status'],
+                                                  namespace=NAMESPACE,
+                                                  buckets=LATENCY_BUCKETS)
+    REQUESTS_IN_FLIGHT = prometheus_client.Gauge('http_requests_in_flight',
+                                                 'Requests currently being served',
+                                                 namespace=NAMESPACE,
+                                                 multiprocess_mode='livesum')
+    DB_QUERY_LATENCY = prometheus_client.Histogram('db_query_duration_seconds',
+                                                   'Seconds spent executing SQL statements',
+                                                   namespace=NAMESPACE,
+                                                   buckets=LATENCY_BUCKETS)
+    SERIALIZATION_LATENCY = prometheus_client.Histogram('serialization_duration_seconds',
+                                                        'Seconds spent dumping response objects',
+                                                        namespace=NAMESPACE,
+                                                        buckets=LATENCY_BUCKETS)
+    CACHE_LOOKUPS = prometheus_client.Counter('cache_lookups',
+                                              'Lookups of the entity caches by whether they were hits or misses',
+                                              ['cache', 'result'],
+                                              namespace=NAMESPACE)
+    CACHE_REMOVALS = prometheus_client.Counter('cache_removals',
+                                               'Entries dropped from the entity caches because they were least '
+                                               'recently used (evicted) or outlived their time to live (expired)',
+                                               ['cache', 'reason'],
+                                               namespace=NAMESPACE)
+    CACHE_ENTRIES = prometheus_client.Gauge('cache_entries',
+                                            'Entries currently held by the entity caches',
+                                            ['cache'],
+                                            namespace=NAMESPACE,
+                                            multiprocess_mode='livesum')
+
+# The counters of every cache as of their last export, so that only what happened since is added
+_exported_cache_stats: weakref.WeakKeyDictionary[EntityCache, dict[str, int]] = weakref.WeakKeyDictionary()
+_export_lock = threading.Lock()
+
+
+def _start_request():
+    flask.g.metrics_start = time.perf_counter()
+    REQUESTS_IN_FLIGHT.inc()
+
+
+def _observe_request(response: flask.Response) -> flask.Response:
+    start = flask.g.get('metrics_start')
+    if start is not None:
+        request = flask.request._get_current_object()                              # pylint: disable=protected-access
+        REQUEST_LATENCY.labels(request.blueprint or '',
+                               request.endpoint or 'none',
+                               request.method,
+                               response.status_code).observe(time.perf_counter() - start)
+    return response
+
+
+def _export_cache_stats(response: flask.Response) -> flask.Response:
+    """
+    Add what the enabled caches of the current app counted since their last export to the cache metrics
+    """
+    caches = flask.current_app.extensions['mrmat_python_api_flask'].get('caches', {})
+    with _export_lock:
+        for name, cache in caches.items():
+            if not cache.enabled:
+                continue
+            stats = cache.stats()
+            last = _exported_cache_stats.get(cache, {})
+            _exported_cache_stats[cache] = stats
+            for counter, key, label in ((CACHE_LOOKUPS, 'hits', 'hit'),
+                                        (CACHE_LOOKUPS, 'misses', 'miss'),
+                                        (CACHE_REMOVALS, 'evictions', 'evicted'),
+                                        (CACHE_REMOVALS, 'expirations', 'expired')):
+                if stats[key] > last.get(key, 0):
+                    counter.labels(name, label).inc(stats[key] - last.get(key, 0))
+            CACHE_ENTRIES.labels(name).set(stats['size'])
+    return response
+
+
+def _end_request(exception: BaseException | None = None):
+    if flask.g.pop('metrics_start', None) is not None:
+        REQUESTS_IN_FLIGHT.dec()
+
+
+def _observe_statement(statement: str, elapsed: float, executemany: bool):
+    DB_QUERY_LATENCY.observe(elapsed)
+
+
+def metrics() -> flask.Response:
+    """
+    Respond with the current samples in the Prometheus text format
+    """
+    if MULTIPROCESS:
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return flask.Response(prometheus_client.generate_latest(registry),
+                          content_type=prometheus_client.CONTENT_TYPE_LATEST)
+
+
+def init_metrics(app: flask.Flask, engine: Engine):
+    """
+    Record the metrics of app and its engine and serve them at /metrics. Nothing is recorded and a warning is
+    logged when prometheus_client is not installed
+    """
+    if prometheus_client is None:
+        app.logger.warning('Metrics are enabled but prometheus_client is not installed')
+        return
+    app.before_request(_start_request)
+    app.after_request(_observe_request)
+    app.after_request(_export_cache_stats)
+    app.teardown_request(_end_request)
+    app.add_url_rule('/metrics', 'metrics', metrics)
+    observe_statements(engine, _observe_statement)
+    serializer.dump_observer = SERIALIZATION_LATENCY.observe
@@ -0,0 +1,184 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Mathieu Imfeld
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+"""
+On-demand profiling of single requests
+
+When profiling is enabled the app is wrapped in a WSGI middleware which runs chosen requests under cProfile while
+a sampling thread records their call stacks. A request is profiled when it carries a valid token in the
+X-Profile-Token header, or by chance at the configured sample rate. Every profile is written as a .pstats file,
+readable with pstats or snakeviz, and as a .collapsed file of folded stacks for flamegraph.pl or speedscope. When
+profiling is disabled none of this is installed.
+
+Only one request per process is profiled at a time. From Python 3.12 on cProfile registers with sys.monitoring,
+which allows a single profiler per interpreter and records the calls of every thread. The .pstats file may
+therefore include calls of other requests served concurrently, while the .collapsed file samples the stacks of
+the profiled request's own thread only.
+"""
+
+import collections
+import cProfile
+import os
+import random
+import re
+import sys
+import threading
+import time
+import typing
+
+import itsdangerous
+
+TOKEN_HEADER = 'X-Profile-Token'
+TOKEN_SALT = 'mrmat-python-api-flask.profiling'
+TOKEN_MAX_AGE = 3600
+STACK_SAMPLE_INTERVAL = 0.001
+
+# Held while a request is profiled, since only one profiler can be active in the interpreter
+_profile_lock = threading.Lock()
+
+
+def create_token(secret_key: str) -> str:
+    """
+    Return a token for the X-Profile-Token header, valid for TOKEN_MAX_AGE seconds for apps sharing secret_key
+    """
+    return itsdangerous.URLSafeTimedSerializer(secret_key, salt=TOKEN_SALT).dumps('profile')
+
+
+def verify_token(secret_key: str, token: str | None) -> bool:
+    if not token:
+        return False
+    try:
+        itsdangerous.URLSafeTimedSerializer(secret_key, salt=TOKEN_SALT).loads(token, max_age=TOKEN_MAX_AGE)
+        return True
+    except itsdangerous.BadData:
+        return False
+
+
+class StackSampler:
+    """
+    Counts the call stacks of one thread, sampled from another thread at a fixed interval
+    """
+
+    def __init__(self, thread_id: int, interval: float = STACK_SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: collections.Counter[str] = collections.Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profiling-sampler', daemon=True)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)                  # pylint: disable=protected-access
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_filename}:{code.co_name}:{frame.f_lineno}')
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> collections.Counter[str]:
+        self._stopped.set()
+        self._thread.join()
+        return self.stacks
+
+
+class ProfilingMiddleware:
+    """
+    WSGI middleware profiling the requests that ask for it or are sampled. Requests below the exclude path prefix
+    are never profiled, and requests arriving while another one is profiled are served without profiling. Only the
+    time until the app returns its response is profiled, streamed response bodies are produced afterwards
+    """
+
+    def __init__(self, wsgi_app: typing.Callable, secret_key: str, directory: str, sample_rate: float = 0.0,
+                 keep: int = 50, exclude: str | None = None):
+        self.wsgi_app = wsgi_app
+        self.exclude = exclude
+        self.secret_key = secret_key
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.keep = keep
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def __call__(self, environ: dict, start_response: typing.Callable):
+        if self.exclude and environ.get('PATH_INFO', '').startswith(self.exclude):
+            return self.wsgi_app(environ, start_response)
+        requested = verify_token(self.secret_key, environ.get('HTTP_X_PROFILE_TOKEN'))
+        if not requested and not (self.sample_rate > 0 and random.random() < self.sample_rate):
+            return self.wsgi_app(environ, start_response)
+        if not _profile_lock.acquire(blocking=False):
+            return self.wsgi_app(environ, start_response)
+        try:
+            return self._profile(environ, start_response)
+        finally:
+            _profile_lock.release()
+
+    def _profile(self, environ: dict, start_response: typing.Callable):
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiling tool, such as a debugger, holds the profiler slot of the interpreter
+            return self.wsgi_app(environ, start_response)
+        sampler = StackSampler(threading.get_ident())
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            return self.wsgi_app(environ, start_response)
+        finally:
+            profile.disable()
+            stacks = sampler.stop()
+            self._write(environ, profile, stacks, time.perf_counter() - start)
+
+    def _write(self, environ: dict, profile: cProfile.Profile, stacks: collections.Counter, elapsed: float):
+        path = re.sub(r'[^A-Za-z0-9_.-]+', '_', environ.get('PATH_INFO', '/').strip('/')) or 'root'
+        name = f'{time.time_ns()}-{environ.get("REQUEST_METHOD", "GET")}-{path[:100]}-{elapsed * 1000:.0f}ms'
+        profile.dump_stats(os.path.join(self.directory, f'{name}.pstats'))
+        with open(os.path.join(self.directory, f'{name}.collapsed'), 'w', encoding='UTF-8') as f:
+            f.writelines(f'{stack} {count}\n' for stack, count in stacks.items())
+        self._prune()
+
+    def _prune(self):
+        with self._lock:
+            names = sorted({os.path.splitext(entry)[0] for entry in os.listdir(self.directory)
+                            if entry.endswith(('.pstats', '.collapsed'))})
+            for stale in names[:-self.keep] if self.keep > 0 else names:
+                for suffix in ('.pstats', '.collapsed'):
+                    try:
+                        os.remove(os.path.join(self.directory, stale + suffix))
+                    except FileNotFoundError:
+                        pass
+
+    def profiles(self) -> list[dict[str, typing.Any]]:
+        """
+        Return the profiles on disk, most recent first
+        """
+        profiles = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(('.pstats', '.collapsed')):
+                stat = entry.stat()
+                profiles.append({'name': entry.name, 'size': stat.st_size, 'created': stat.st_mtime})
+        return sorted(profiles, key=lambda profile: profile['name'], reverse=True)
@@ -0,0 +1,144 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Mathieu Imfeld
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+"""
+Per-request accounting of SQL statements and a log of slow ones
+
+When enabled, every response tells how many statements its request executed and how long they took in the
+X-DB-Queries and Server-Timing headers, which makes an N+1 pattern stand out as soon as it is introduced. Statements
+slower than the configured threshold are logged as one JSON object per line, independent of the headers.
+
+Statements are timed once per engine by a single set of listeners, which hand the time each one took to every
+observer registered with observe_statements, such as the per-request accounting here and the Prometheus metrics.
+"""
+
+import dataclasses
+import json
+import logging
+import time
+import typing
+
+import flask
+import sqlalchemy.event
+from sqlalchemy import Engine
+
+from .config import Config
+
+slow_query_log = logging.getLogger('mrmat_python_api_flask.slow_queries')
+
+#: Slow statements are logged up to this many characters
+STATEMENT_LOG_LENGTH = 2000
+
+#: Called with the statement, the seconds it took and whether it was an executemany
+StatementObserver = typing.Callable[[str, float, bool], None]
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('statement_start', []).append(time.perf_counter())
+
+
+def _handle_error(exception_context):
+    starts = exception_context.connection.info.get('statement_start') if exception_context.connection else None
+    if starts:
+        starts.pop()
+
+
+def observe_statements(engine: Engine, observer: StatementObserver):
+    """
+    Have observer called after every statement engine executes. The timing listeners are installed along with
+    the first observer of an engine
+    """
+    observers: list[StatementObserver] | None = getattr(engine, 'statement_observers', None)
+    if observers is None:
+        observers = engine.statement_observers = []
+
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            elapsed = time.perf_counter() - conn.info['statement_start'].pop()
+            for statement_observer in observers:
+                statement_observer(statement, elapsed, executemany)
+
+        sqlalchemy.event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        sqlalchemy.event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+        sqlalchemy.event.listen(engine, 'handle_error', _handle_error)
+    observers.append(observer)
+
+
+@dataclasses.dataclass(slots=True)
+class QueryStats:
+    count: int = 0
+    total: float = 0.0
+    slowest: float = 0.0
+
+    def record(self, elapsed: float):
+        self.count += 1
+        self.total += elapsed
+        self.slowest = max(self.slowest, elapsed)
+
+
+def _start_request():
+    flask.g.query_stats = QueryStats()
+
+
+def _add_headers(response: flask.Response) -> flask.Response:
+    stats = flask.g.get('query_stats')
+    if stats is not None:
+        response.headers['X-DB-Queries'] = str(stats.count)
+        response.headers.add('Server-Timing',
+                             f'db;dur={stats.total * 1000:.3f};desc="{stats.count} queries", '
+                             f'db-slowest;dur={stats.slowest * 1000:.3f}')
+    return response
+
+
+def _log_slow_query(statement: str, elapsed: float, executemany: bool):
+    entry = {
+        'event': 'slow_query',
+        'duration_ms': round(elapsed * 1000, 3),
+        'statement': ' '.join(statement.split())[:STATEMENT_LOG_LENGTH],
+        'executemany': executemany
+    }
+    if flask.has_request_context():
+        entry.update(method=flask.request.method, path=flask.request.path, endpoint=flask.request.endpoint)
+    slow_query_log.warning(json.dumps(entry, sort_keys=True))
+
+
+def init_query_timing(app: flask.Flask, engine: Engine, config: Config):
+    """
+    Account the statements engine executes to the requests of app and log slow ones, as far as config asks for
+    either. Without both nothing is installed
+    """
+    threshold = config.db_slow_query_ms / 1000
+    headers = config.db_query_headers
+    if not headers and threshold <= 0:
+        return
+
+    def observe(statement: str, elapsed: float, executemany: bool):
+        if headers and flask.has_app_context():
+            stats = flask.g.get('query_stats')
+            if stats is not None:
+                stats.record(elapsed)
+        if 0 < threshold <= elapsed:
+            _log_slow_query(statement, elapsed, executemany)
+
+    observe_statements(engine, observe)
+    if headers:
+        app.before_request(_start_request)
+        app.after_request(_add_headers)
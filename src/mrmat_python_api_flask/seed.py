@@ -0,0 +1,143 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Mathieu Imfeld
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+"""
+Synthetic owners and resources for benchmarks and capacity planning
+
+    flask --app mrmat_python_api_flask seed --owners 10000 --resources-per-owner 100 --workers 4
+
+Rows are written in chunks, using bulk inserts or COPY on PostgreSQL, from as many processes as asked for. SQLite
+allows a single writer, so it is always seeded from the current process.
+"""
+
+import concurrent.futures
+import io
+import time
+import uuid
+
+import click
+import sqlalchemy
+from flask.cli import with_appcontext
+
+from mrmat_python_api_flask import db
+from mrmat_python_api_flask.keys import new_key, key_storage, set_key_storage
+from mrmat_python_api_flask.apis.platform.v1 import Owner, Resource
+
+OWNER_COLUMNS = ('uid', 'name', 'version')
+RESOURCE_COLUMNS = ('uid', 'owner_uid', 'name', 'version')
+
+
+def _copy(connection: sqlalchemy.Connection, table: sqlalchemy.Table, columns: tuple[str, ...], rows: list[tuple]):
+    """
+    Write rows through COPY of psycopg or psycopg2. The generated values contain no tabs, newlines or backslashes,
+    and keys are stored as text or as native UUIDs, both of which COPY reads from their string form
+    """
+    raw = connection.connection.driver_connection
+    statement = f'COPY {table.name} ({", ".join(columns)}) FROM STDIN'
+    if connection.dialect.driver == 'psycopg':
+        with raw.cursor() as cursor, cursor.copy(statement) as copy:
+            for row in rows:
+                copy.write_row(row)
+    else:
+        buffer = io.StringIO(''.join('\t'.join(str(value) for value in row) + '\n' for row in rows))
+        with raw.cursor() as cursor:
+            cursor.copy_expert(statement, buffer)
+
+
+def _insert(connection: sqlalchemy.Connection, table: sqlalchemy.Table, columns: tuple[str, ...], rows: list[tuple]):
+    if connection.dialect.name == 'postgresql' and connection.dialect.driver in ('psycopg', 'psycopg2') \
+            and key_storage(connection.dialect) != 'binary':
+        _copy(connection, table, columns, rows)
+    else:
+        connection.execute(table.insert(), [dict(zip(columns, row)) for row in rows])
+
+
+def seed_owners(engine: sqlalchemy.Engine, prefix: str, start: int, stop: int, resources_per_owner: int,
+                chunk_size: int) -> int:
+    """
+    Insert the owners numbered start to stop with their resources, one transaction per chunk, and return the
+    number of rows inserted. Resource names are numbered per owner, so they never clash
+    """
+    owners_per_chunk = max(1, chunk_size // max(1, resources_per_owner))
+    inserted = 0
+    for first in range(start, stop, owners_per_chunk):
+        last = min(first + owners_per_chunk, stop)
+        owners = [(new_key(), f'{prefix}-owner-{i}', 1) for i in range(first, last)]
+        resources = [(new_key(), owner_uid, f'{prefix}-resource-{n}', 1)
+                     for owner_uid, _, _ in owners for n in range(resources_per_owner)]
+        with engine.begin() as connection:
+            _insert(connection, Owner.__table__, OWNER_COLUMNS, owners)
+            for offset in range(0, len(resources), chunk_size):
+                _insert(connection, Resource.__table__, RESOURCE_COLUMNS, resources[offset:offset + chunk_size])
+        inserted += len(owners) + len(resources)
+    return inserted
+
+
+def _seed_in_process(url: str, storage: str, prefix: str, start: int, stop: int, resources_per_owner: int,
+                     chunk_size: int) -> int:
+    engine = sqlalchemy.create_engine(url)
+    set_key_storage(engine, storage)
+    try:
+        return seed_owners(engine, prefix, start, stop, resources_per_owner, chunk_size)
+    finally:
+        engine.dispose()
+
+
+@click.command('seed')
+@click.option('--owners', type=click.IntRange(min=1), default=100, show_default=True,
+              help='Number of owners to create')
+@click.option('--resources-per-owner', type=click.IntRange(min=0), default=100, show_default=True,
+              help='Number of resources to create for each owner')
+@click.option('--chunk-size', type=click.IntRange(min=1), default=10000, show_default=True,
+              help='Number of rows written per insert')
+@click.option('--workers', type=click.IntRange(min=1), default=1, show_default=True,
+              help='Number of processes writing in parallel, SQLite is always seeded by one')
+@click.option('--prefix', default=None,
+              help='Prefix of the generated names, random unless given')
+@with_appcontext
+def seed_command(owners: int, resources_per_owner: int, chunk_size: int, workers: int, prefix: str | None):
+    """
+    Seed the database with synthetic owners and resources
+    """
+    prefix = prefix or f'seed-{uuid.uuid4().hex[:8]}'
+    db.create_all()
+    engine = db.engine
+    if workers > 1 and engine.dialect.name == 'sqlite':
+        click.echo('SQLite allows a single writer, seeding from one process')
+        workers = 1
+
+    start = time.perf_counter()
+    if workers == 1:
+        inserted = seed_owners(engine, prefix, 0, owners, resources_per_owner, chunk_size)
+    else:
+        url = engine.url.render_as_string(hide_password=False)
+        storage = key_storage(engine.dialect)
+        engine.dispose()
+        bounds = [owners * n // workers for n in range(workers + 1)]
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_seed_in_process, url, storage, prefix, low, high, resources_per_owner,
+                                       chunk_size)
+                       for low, high in zip(bounds, bounds[1:]) if high > low]
+            inserted = sum(future.result() for future in futures)
+    elapsed = time.perf_counter() - start
+    click.echo(f'Seeded {owners} owners and {owners * resources_per_owner} resources named {prefix}-* '
+               f'in {elapsed:.2f}s, {inserted / elapsed:,.0f} rows/s')
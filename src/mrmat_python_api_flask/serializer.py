@@ -0,0 +1,163 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Mathieu Imfeld
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+"""
+Precompiled dump functions for marshmallow schemas
+
+Marshmallow serializes an object by walking the schema fields one at a time through several layers of
+indirection. For the flat schemas of this API that work reduces to reading a handful of attributes, so
+compile_dump() generates a single specialised function per schema instance from its dump fields which does just
+that. Schemas that use anything the compiler does not understand are left to marshmallow, which also remains in
+charge of loading and validation.
+"""
+
+import collections.abc
+import threading
+import time
+import typing
+
+import marshmallow
+from marshmallow import fields
+from marshmallow.decorators import PRE_DUMP, POST_DUMP
+
+#: Called with the seconds every outermost dump took when set, which is how the metrics observe serialization
+dump_observer: typing.Callable[[float], None] | None = None
+_dumping = threading.local()
+
+# Field types whose serialization depends on nothing but the value, mapped to the type they emit unchanged
+_COMPILABLE_FIELDS: dict[type, type | None] = {
+    fields.String: str,
+    fields.Integer: int,
+    fields.Boolean: bool,
+    fields.Float: float,
+    fields.UUID: None,
+    fields.DateTime: None,
+    fields.Date: None,
+}
+
+
+def _has_dump_hooks(schema: marshmallow.Schema) -> bool:
+    for tag, hooks in schema._hooks.items():
+        name = tag[0] if isinstance(tag, tuple) else tag
+        if name in (PRE_DUMP, POST_DUMP) and hooks:
+            return True
+    return False
+
+
+def compile_dump(schema: marshmallow.Schema) -> typing.Callable[[typing.Any], dict] | None:
+    """
+    Generate a function dumping a single object the way schema.dump(obj, many=False) would. Returns None when the
+    schema cannot be compiled.
+    """
+    if _has_dump_hooks(schema) \
+            or schema.dict_class is not dict \
+            or type(schema).get_attribute is not marshmallow.Schema.get_attribute:
+        return None
+
+    namespace: dict[str, typing.Any] = {
+        '_missing': marshmallow.missing,
+        '_Sequence': collections.abc.Sequence,
+        '_fallback': lambda obj: super(CompiledDumpMixin, schema).dump(obj, many=False),
+    }
+    attr_lines = []
+    mapping_lines = []
+    for index, (attr_name, field) in enumerate(schema.dump_fields.items()):
+        if type(field) not in _COMPILABLE_FIELDS:
+            return None
+        source = attr_name if field.attribute is None else field.attribute
+        if '.' in source:
+            return None
+        key = attr_name if field.data_key is None else field.data_key
+        namespace[f'_serialize_{index}'] = field._serialize
+
+        value_lines = []
+        default = field.dump_default
+        if default is not marshmallow.missing:
+            namespace[f'_default_{index}'] = default
+            default_expr = f'_default_{index}()' if callable(default) else f'_default_{index}'
+            value_lines.append(f'    if v is _missing: v = {default_expr}')
+            indent = '    '
+        else:
+            value_lines.append('    if v is not _missing:')
+            indent = '        '
+        native = _COMPILABLE_FIELDS[type(field)]
+        if native is not None and not getattr(field, 'as_string', False):
+            namespace[f'_native_{index}'] = native
+            value_lines.append(f'{indent}out[{key!r}] = v if type(v) is _native_{index} or v is None '
+                               f'else _serialize_{index}(v, {attr_name!r}, obj)')
+        else:
+            value_lines.append(f'{indent}out[{key!r}] = _serialize_{index}(v, {attr_name!r}, obj)')
+
+        attr_lines.append(f'    v = getattr(obj, {source!r}, _missing)')
+        attr_lines.extend(value_lines)
+        mapping_lines.append(f'    v = obj.get({source!r}, _missing)')
+        mapping_lines.append(f'    if v is _missing: v = getattr(obj, {source!r}, _missing)')
+        mapping_lines.extend(value_lines)
+
+    source = '\n'.join([
+        'def _dump(obj):',
+        '    out = {}',
+        '    if type(obj) is dict:',
+        '        return _dump_mapping(obj, out)',
+        '    if hasattr(obj, "__getitem__") and not isinstance(obj, _Sequence):',
+        '        return _fallback(obj)',
+        *attr_lines,
+        '    return out',
+        '',
+        'def _dump_mapping(obj, out):',
+        *mapping_lines,
+        '    return out',
+    ])
+    exec(compile(source, f'<compiled dump of {type(schema).__name__}>', 'exec'), namespace)   # noqa: S102
+    return namespace['_dump']
+
+
+class CompiledDumpMixin:
+    """
+    Mixin for marshmallow schemas replacing dump() with a function compiled from the schema fields when the
+    schema instance is created. Schemas that cannot be compiled fall back to marshmallow.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._compiled_dump = compile_dump(self)
+
+    def dump(self, obj: typing.Any, *, many: bool | None = None):
+        observer = dump_observer
+        if observer is None or getattr(_dumping, 'active', False):
+            return self._dump(obj, many=many)
+        _dumping.active = True
+        start = time.perf_counter()
+        try:
+            return self._dump(obj, many=many)
+        finally:
+            _dumping.active = False
+            observer(time.perf_counter() - start)
+
+    def _dump(self, obj: typing.Any, *, many: bool | None = None):
+        compiled = self._compiled_dump
+        many = self.many if many is None else bool(many)
+        if compiled is None or obj is None:
+            return super().dump(obj, many=many)
+        if many:
+            return [compiled(item) for item in obj]
+        return compiled(obj)
@@ -0,0 +1,90 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Mathieu Imfeld
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+"""
+A registry of engines and thread-local sessions for code running outside of Flask-SQLAlchemy
+"""
+
+import copy
+import threading
+
+from sqlalchemy import create_engine, Engine
+from sqlalchemy.orm import Session, scoped_session, sessionmaker
+
+from mrmat_python_api_flask import app_config, ORMBase
+from mrmat_python_api_flask.engine import engine_options, configure_engine, dispose_after_fork
+
+_lock = threading.Lock()
+_engines: dict[str, Engine] = {}
+_sessions: dict[str, scoped_session] = {}
+
+
+def get_engine(url: str | None = None) -> Engine:
+    """
+    Return the engine for url, or the configured database when not given. Every database gets a single engine
+    per process, created along with its schema on first use
+    """
+    url = url or app_config.db_url
+    with _lock:
+        engine = _engines.get(url)
+        if engine is None:
+            config = copy.copy(app_config)
+            config.db_url = url
+            engine = create_engine(url=url, **engine_options(config))
+            configure_engine(engine, config)
+            ORMBase.metadata.create_all(bind=engine)
+            _engines[url] = engine
+            _sessions[url] = scoped_session(sessionmaker(autoflush=False, bind=engine))
+    return engine
+
+
+def get_db(url: str | None = None) -> Session:
+    """
+    Return the session of the current thread for url, or the configured database when not given. The same
+    session is returned until remove_db is called, which happens at the end of every Flask app context
+    """
+    url = url or app_config.db_url
+    get_engine(url)
+    return _sessions[url]()
+
+
+def remove_db(exception: BaseException | None = None):
+    """
+    Close and forget the sessions of the current thread
+    """
+    with _lock:
+        registries = list(_sessions.values())
+    for registry in registries:
+        registry.remove()
+
+
+def dispose_engines(after_fork: bool = False):
+    """
+    Close every pooled connection, or only forget them in a process that was just forked
+    """
+    with _lock:
+        engines = list(_engines.values())
+    for engine in engines:
+        if after_fork:
+            dispose_after_fork(engine)
+        else:
+            engine.dispose()
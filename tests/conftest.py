@@ -20,11 +20,52 @@
 #  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 #  SOFTWARE.
 
+import itertools
+import typing
+
+import flask
 import pytest
 
-from mrmat_python_api_flask import app
+from mrmat_python_api_flask import app, create_app, db
+from mrmat_python_api_flask.config import Config
 
 @pytest.fixture(scope='session')
 def client():
     app.config.update({'TESTING': True})
     return app.test_client()
+
+
+@pytest.fixture()
+def make_config(tmp_path) -> typing.Callable[..., Config]:
+    """
+    Return a factory of configurations for db_url, or for a new SQLite database file in tmp_path when it is not
+    given, with the other settings given as keyword arguments
+    """
+    databases = itertools.count()
+
+    def factory(db_url: str | None = None, **settings) -> Config:
+        config = Config()
+        config.db_url = db_url or f'sqlite:///{tmp_path}/app-{next(databases)}.db'
+        for name, value in settings.items():
+            setattr(config, name, value)
+        return config
+
+    return factory
+
+
+@pytest.fixture()
+def make_app(make_config) -> typing.Iterator[typing.Callable[..., flask.Flask]]:
+    """
+    Return a factory of apps created for the configuration make_config returns for the same arguments. The
+    engines of the apps are disposed after the test
+    """
+    apps = []
+
+    def factory(db_url: str | None = None, **settings) -> flask.Flask:
+        apps.append(create_app(make_config(db_url, **settings)))
+        return apps[-1]
+
+    yield factory
+    for created in apps:
+        with created.app_context():
+            db.engine.dispose()
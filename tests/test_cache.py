@@ -0,0 +1,144 @@
+#  MIT License
+#
+#  Copyright (c) 2025 Mathieu Imfeld
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+import random
+import threading
+import time
+
+import flask.testing
+
+from mrmat_python_api_flask.cache import EntityCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cache_lru_and_ttl():
+    clock = FakeClock()
+    cache = EntityCache(maxsize=2, ttl=10, clock=clock)
+    assert cache.get_or_load('a', lambda: 'A') == 'A'
+    assert cache.get_or_load('b', lambda: 'B') == 'B'
+    assert cache.get_or_load('a', lambda: 'stale') == 'A'
+    assert cache.get_or_load('c', lambda: 'C') == 'C'
+    assert cache.get_or_load('b', lambda: 'B2') == 'B2'
+    assert cache.get_or_load('missing', lambda: None) is None
+    clock.now = 11
+    assert cache.get_or_load('b', lambda: 'B3') == 'B3'
+    assert cache.stats() == {'size': 2, 'hits': 1, 'misses': 6, 'evictions': 2, 'expirations': 1}
+
+
+def test_cache_disabled():
+    cache = EntityCache(enabled=False)
+    assert cache.get_or_load('a', lambda: 'A') == 'A'
+    assert cache.get_or_load('a', lambda: 'B') == 'B'
+    assert len(cache) == 0
+
+
+def test_cache_discards_load_racing_an_invalidation():
+    cache = EntityCache()
+    loading, release = threading.Event(), threading.Event()
+
+    def slow_loader():
+        loading.set()
+        release.wait()
+        return 'before-write'
+
+    reader = threading.Thread(target=cache.get_or_load, args=('a', slow_loader))
+    reader.start()
+    loading.wait()
+    cache.invalidate('a')
+    release.set()
+    reader.join()
+    assert cache.get_or_load('a', lambda: 'after-write') == 'after-write'
+
+
+def test_cache_concurrent_writers():
+    cache = EntityCache(maxsize=8, ttl=60)
+    store = {f'key-{i}': 0 for i in range(16)}
+    store_lock = threading.Lock()
+    stop = threading.Event()
+
+    def loader(key):
+        with store_lock:
+            value = store[key]
+        time.sleep(random.random() / 1000)
+        return value
+
+    def writer():
+        while not stop.is_set():
+            key = random.choice(list(store))
+            with store_lock:
+                store[key] += 1
+            cache.invalidate(key)
+            time.sleep(random.random() / 1000)
+
+    def reader():
+        while not stop.is_set():
+            key = random.choice(list(store))
+            cache.get_or_load(key, lambda: loader(key))
+
+    threads = [threading.Thread(target=writer) for _ in range(4)] + \
+              [threading.Thread(target=reader) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.5)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    for key, value in store.items():
+        assert cache.get_or_load(key, lambda: loader(key)) == value
+    assert cache.hits > 0
+    assert len(cache) <= 8
+
+
+def test_cache_invalidated_by_writes(client: flask.testing.Client, monkeypatch):
+    resource_cache = EntityCache()
+    owner_cache = EntityCache()
+    caches = client.application.extensions['mrmat_python_api_flask']['caches']
+    monkeypatch.setitem(caches, 'resources', resource_cache)
+    monkeypatch.setitem(caches, 'owners', owner_cache)
+
+    owner = client.post('/api/platform/v1/owners', json={'name': 'cached-owner'}).json
+    resource = client.post('/api/platform/v1/resources',
+                           json={'name': 'cached-resource', 'owner_uid': owner['uid']}).json
+    for _ in range(3):
+        assert client.get(f'/api/platform/v1/resources/{resource["uid"]}').json == resource
+        assert client.get(f'/api/platform/v1/owners/{owner["uid"]}').json == owner
+    assert resource_cache.stats()['hits'] == 2
+    assert owner_cache.stats()['hits'] == 2
+
+    client.put(f'/api/platform/v1/owners/{owner["uid"]}', json={'name': 'renamed-owner'})
+    assert client.get(f'/api/platform/v1/owners/{owner["uid"]}').json['name'] == 'renamed-owner'
+    client.put(f'/api/platform/v1/resources/{resource["uid"]}',
+               json={'name': 'renamed-resource', 'owner_uid': owner['uid']})
+    assert client.get(f'/api/platform/v1/resources/{resource["uid"]}').json['name'] == 'renamed-resource'
+
+    assert client.delete(f'/api/platform/v1/resources/{resource["uid"]}').status_code == 204
+    assert client.get(f'/api/platform/v1/resources/{resource["uid"]}').status_code == 404
+    assert client.delete(f'/api/platform/v1/owners/{owner["uid"]}').status_code == 204
+    assert client.get(f'/api/platform/v1/owners/{owner["uid"]}').status_code == 404
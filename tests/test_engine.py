@@ -0,0 +1,146 @@
+#  MIT License
+#
+#  Copyright (c) 2025 Mathieu Imfeld
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+import collections
+import threading
+
+import pytest
+import sqlalchemy
+import sqlalchemy.exc
+import flask.testing
+
+from mrmat_python_api_flask import db
+from mrmat_python_api_flask.config import Config
+from mrmat_python_api_flask.engine import InstrumentedQueuePool, engine_options, configure_engine, pool_stats
+from mrmat_python_api_flask.apis.healthz import pool_stats_schema
+
+
+def test_engine_options(make_config):
+    assert engine_options(make_config('sqlite:///'))['poolclass'] is sqlalchemy.pool.StaticPool
+    assert 'pool_size' not in engine_options(make_config('sqlite:///:memory:'))
+    options = engine_options(make_config('sqlite:///file:app?mode=memory&cache=shared&uri=true', db_pool_size=8))
+    assert (options['pool_size'], options['max_overflow']) == (1, 0)
+    options = engine_options(make_config('postgresql://db/app', db_pool_size=2, db_max_overflow=1,
+                                         db_pool_recycle=300, db_statement_timeout=5000))
+    assert options['poolclass'] is InstrumentedQueuePool
+    assert (options['pool_size'], options['max_overflow'], options['pool_recycle']) == (2, 1, 300)
+    assert options['connect_args'] == {'options': '-c statement_timeout=5000'}
+    assert 'pool_recycle' not in engine_options(make_config('sqlite:///app.db'))
+    assert engine_options(make_config('sqlite:///app.db', db_statement_timeout=5000))['connect_args'] == \
+           {'check_same_thread': False}
+
+
+def test_config_from_environment(monkeypatch):
+    monkeypatch.delenv('APP_CONFIG', raising=False)
+    monkeypatch.setenv('APP_CONFIG_DB_POOL_SIZE', '20')
+    monkeypatch.setenv('APP_CONFIG_DB_POOL_PRE_PING', 'true')
+    monkeypatch.setenv('APP_CONFIG_DB_POOL_RECYCLE', '')
+    config = Config.from_context(None)
+    assert config.db_pool_size == 20
+    assert config.db_pool_pre_ping is True
+    assert config.db_pool_recycle is None
+
+
+def test_instrumented_pool(make_config):
+    config = make_config(db_pool_size=1, db_max_overflow=0, db_pool_timeout=0.05)
+    engine = sqlalchemy.create_engine(config.db_url, **engine_options(config))
+    try:
+        with engine.connect():
+            stats = pool_stats(engine.pool)
+            assert (stats['size'], stats['checked_out'], stats['checkouts']) == (1, 1, 1)
+            with pytest.raises(sqlalchemy.exc.TimeoutError):
+                engine.connect()
+        stats = pool_stats(engine.pool)
+        assert stats['pool'] == 'InstrumentedQueuePool'
+        assert (stats['checked_out'], stats['checked_in'], stats['timeouts']) == (0, 1, 1)
+        assert 0 <= stats['wait_time_max'] <= stats['wait_time_total']
+    finally:
+        engine.dispose()
+
+
+@pytest.mark.parametrize('profile,journal_mode,synchronous', [(True, 'wal', 1), (False, 'delete', 2)])
+def test_sqlite_profile(make_config, profile: bool, journal_mode: str, synchronous: int):
+    config = make_config(db_sqlite_profile=profile)
+    engine = sqlalchemy.create_engine(config.db_url, **engine_options(config))
+    configure_engine(engine, config)
+    try:
+        with engine.connect() as connection:
+            assert connection.exec_driver_sql('PRAGMA journal_mode').scalar() == journal_mode
+            assert connection.exec_driver_sql('PRAGMA synchronous').scalar() == synchronous
+    finally:
+        engine.dispose()
+
+
+def test_sqlite_shared_memory(make_config):
+    config = make_config('sqlite:///file:test-shared-memory?mode=memory&cache=shared&uri=true', db_pool_size=1)
+    engine = sqlalchemy.create_engine(config.db_url, **engine_options(config))
+    configure_engine(engine, config)
+    with engine.begin() as connection:
+        connection.exec_driver_sql('CREATE TABLE shared (value INTEGER)')
+        connection.exec_driver_sql('INSERT INTO shared VALUES (42)')
+    engine.dispose()
+
+    seen = []
+    def read():
+        with engine.connect() as thread_connection:
+            seen.append(thread_connection.exec_driver_sql('SELECT value FROM shared').scalar())
+    thread = threading.Thread(target=read)
+    thread.start()
+    thread.join()
+    assert seen == [42]
+    engine.shared_memory_anchor.close()
+
+
+def test_sqlite_shared_memory_concurrent_writers(make_app):
+    app = make_app('sqlite:///file:test-shared-writers?mode=memory&cache=shared&uri=true')
+    statuses = collections.Counter()
+    lock = threading.Lock()
+
+    def crud(worker: int):
+        client = app.test_client()
+        for i in range(25):
+            response = client.post('/api/platform/v1/owners', json={'name': f'shared-owner-{worker}-{i}'})
+            codes = [response.status_code]
+            if response.status_code == 201:
+                path = f'/api/platform/v1/owners/{response.json["uid"]}'
+                codes += [client.put(path, json={'name': f'renamed-owner-{worker}-{i}'}).status_code,
+                          client.get(path).status_code,
+                          client.delete(path).status_code]
+            with lock:
+                statuses.update(codes)
+
+    threads = [threading.Thread(target=crud, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert statuses == {201: 100, 200: 200, 204: 100}
+    with app.app_context():
+        db.engine.shared_memory_anchor.close()
+
+
+def test_pool_endpoint(client: flask.testing.Client):
+    response = client.get('/api/healthz/pool')
+    assert response.status_code == 200
+    stats = pool_stats_schema.load(response.json)
+    assert stats.pool == 'StaticPool'
+    assert stats.size is None
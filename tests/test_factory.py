@@ -0,0 +1,52 @@
+#  MIT License
+#
+#  Copyright (c) 2025 Mathieu Imfeld
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+import sqlalchemy
+
+from mrmat_python_api_flask import db
+
+
+def test_create_app_defers_schema_to_first_request(make_app):
+    app = make_app()
+    with app.app_context():
+        engine = db.engine
+    assert str(engine.url) == app.config['SQLALCHEMY_DATABASE_URI']
+    assert not sqlalchemy.inspect(engine).has_table('owners')
+
+    client = app.test_client()
+    assert client.get('/api/platform/v1/owners').json == []
+    assert sqlalchemy.inspect(engine).has_table('owners')
+    response = client.post('/api/platform/v1/owners', json={'name': 'factory-owner'})
+    assert response.status_code == 201
+    assert [owner['name'] for owner in client.get('/api/platform/v1/owners').json] == ['factory-owner']
+
+
+def test_apps_keep_their_own_caches(make_app):
+    client_a, client_b = (make_app(cache_enabled=True).test_client() for _ in range(2))
+
+    owner = client_a.post('/api/platform/v1/owners', json={'name': 'owner-of-a'}).json
+    assert client_a.get(f'/api/platform/v1/owners/{owner["uid"]}').status_code == 200
+    assert len(client_a.get('/api/platform/v1/owners', query_string={'with_counts': 1}).json) == 1
+
+    assert client_b.get(f'/api/platform/v1/owners/{owner["uid"]}').status_code == 404
+    assert client_b.get('/api/platform/v1/owners', query_string={'with_counts': 1}).json == []
+    assert client_b.get('/api/platform/v1/owners').json == []
@@ -0,0 +1,90 @@
+#  MIT License
+#
+#  Copyright (c) 2025 Mathieu Imfeld
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+import importlib
+
+import pytest
+import flask.testing
+
+from mrmat_python_api_flask import gunicorn_conf
+
+
+@pytest.mark.parametrize('files,limit', [
+    ({'cpu.max': '150000 100000\n'}, 1.5),
+    ({'cpu.max': 'max 100000\n'}, None),
+    ({'cpu/cpu.cfs_quota_us': '200000\n', 'cpu/cpu.cfs_period_us': '100000\n'}, 2.0),
+    ({'cpu/cpu.cfs_quota_us': '-1\n', 'cpu/cpu.cfs_period_us': '100000\n'}, None),
+    ({}, None)
+])
+def test_cgroup_cpu_limit(tmp_path, files: dict, limit: float | None):
+    for name, content in files.items():
+        (tmp_path / name).parent.mkdir(exist_ok=True)
+        (tmp_path / name).write_text(content)
+    assert gunicorn_conf._cgroup_cpu_limit(str(tmp_path)) == limit
+
+
+def test_available_cpus_honours_cgroup_limit(monkeypatch):
+    monkeypatch.setattr(gunicorn_conf.os, 'sched_getaffinity', lambda pid: set(range(16)))
+    monkeypatch.setattr(gunicorn_conf, '_cgroup_cpu_limit', lambda: 1.5)
+    assert gunicorn_conf.available_cpus() == 2
+    monkeypatch.setattr(gunicorn_conf, '_cgroup_cpu_limit', lambda: None)
+    assert gunicorn_conf.available_cpus() == 16
+
+
+@pytest.mark.parametrize('worker_class,threads', [('sync', 1), ('gthread', 4), ('gevent', 1)])
+def test_worker_class(monkeypatch, worker_class: str, threads: int):
+    monkeypatch.setenv('GUNICORN_WORKER_CLASS', worker_class)
+    monkeypatch.setenv('WEB_CONCURRENCY', '3')
+    monkeypatch.setenv('APP_CONFIG_DB_URL', 'postgresql://db/app')
+    try:
+        conf = importlib.reload(gunicorn_conf)
+        assert (conf.worker_class, conf.workers, conf.threads) == (worker_class, 3, threads)
+        monkeypatch.setenv('GUNICORN_WORKER_CLASS', 'eventlet')
+        with pytest.raises(ValueError):
+            importlib.reload(gunicorn_conf)
+    finally:
+        monkeypatch.undo()
+        importlib.reload(gunicorn_conf)
+
+
+@pytest.mark.parametrize('db_url,worker_class,workers,threads', [
+    ('sqlite:///', 'sync', 1, 1),
+    ('sqlite:///:memory:', 'sync', 1, 1),
+    ('sqlite:///file:app?mode=memory&cache=shared&uri=true', 'gthread', 1, 4),
+    ('sqlite:////dev/shm/app.db', 'gthread', 3, 4)
+])
+def test_in_memory_database_served_by_one_worker(monkeypatch, db_url: str, worker_class: str, workers: int,
+                                                 threads: int):
+    monkeypatch.delenv('GUNICORN_WORKER_CLASS', raising=False)
+    monkeypatch.setenv('WEB_CONCURRENCY', '3')
+    monkeypatch.setenv('APP_CONFIG_DB_URL', db_url)
+    try:
+        conf = importlib.reload(gunicorn_conf)
+        assert (conf.worker_class, conf.workers, conf.threads) == (worker_class, workers, threads)
+    finally:
+        monkeypatch.undo()
+        importlib.reload(gunicorn_conf)
+
+
+def test_post_fork_keeps_in_memory_database(client: flask.testing.Client):
+    gunicorn_conf.post_fork(None, None)
+    assert client.get('/api/platform/v1/owners').status_code == 200
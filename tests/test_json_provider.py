@@ -0,0 +1,81 @@
+#  MIT License
+#
+#  Copyright (c) 2025 Mathieu Imfeld
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+import dataclasses
+import datetime
+import decimal
+import uuid
+
+import flask
+import flask.testing
+import pytest
+from flask.json.provider import DefaultJSONProvider
+
+from mrmat_python_api_flask import json_provider
+from mrmat_python_api_flask.config import Config
+from mrmat_python_api_flask.json_provider import OrjsonProvider, create_json_provider
+
+orjson = pytest.importorskip('orjson')
+
+
+@dataclasses.dataclass
+class Payload:
+    uid: uuid.UUID
+    amount: decimal.Decimal
+    created: datetime.datetime
+
+
+def test_config_selects_json_provider(monkeypatch):
+    monkeypatch.setenv('APP_CONFIG_JSON_PROVIDER', 'orjson')
+    assert Config.from_context(None).json_provider == 'orjson'
+
+
+def test_create_json_provider(monkeypatch):
+    app = flask.Flask(__name__)
+    assert isinstance(create_json_provider(app, 'orjson'), OrjsonProvider)
+    assert isinstance(create_json_provider(app, 'default'), DefaultJSONProvider)
+    assert isinstance(create_json_provider(app, 'unknown'), DefaultJSONProvider)
+    monkeypatch.setattr(json_provider, 'orjson', None)
+    assert isinstance(create_json_provider(app, 'orjson'), DefaultJSONProvider)
+
+
+@pytest.mark.parametrize('obj', [
+    [{'uid': str(uuid.uuid4()), 'owner_uid': None, 'name': 'Ünïcödé'}],
+    {'code': 404, 'msg': 'No such resource', 'ok': False, 'ratio': 0.5},
+    Payload(uid=uuid.uuid4(), amount=decimal.Decimal('1.10'), created=datetime.datetime(2022, 1, 1, 12)),
+])
+def test_orjson_provider_matches_default(obj):
+    app = flask.Flask(__name__)
+    default, fast = DefaultJSONProvider(app), OrjsonProvider(app)
+    assert fast.loads(fast.dumps(obj)) == default.loads(default.dumps(obj))
+    with app.app_context():
+        assert fast.loads(fast.response(obj).get_data()) == default.loads(default.response(obj).get_data())
+
+
+def test_orjson_provider_serves_requests(client: flask.testing.Client, monkeypatch):
+    monkeypatch.setattr(client.application, 'json', OrjsonProvider(client.application))
+    response = client.get('/api/greeting/v2/', query_string={'name': 'orjson'})
+    assert response.status_code == 200
+    assert response.data == b'{"message":"Hello orjson"}\n'
+    response = client.get('/api/platform/v1/owners/unknown')
+    assert response.status_code == 404
+    assert response.json == {'code': 404, 'msg': 'No such owner'}
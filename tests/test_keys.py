@@ -0,0 +1,118 @@
+#  MIT License
+#
+#  Copyright (c) 2025 Mathieu Imfeld
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+import uuid
+
+import pytest
+import sqlalchemy
+
+from mrmat_python_api_flask import create_app, db
+from mrmat_python_api_flask.keys import uuid7, new_key
+
+
+def test_uuid7():
+    keys = [uuid7() for _ in range(10000)]
+    assert keys == sorted(keys)
+    assert len(set(keys)) == len(keys)
+    assert all(key.version == 7 and key.variant == uuid.RFC_4122 for key in keys)
+    assert uuid.UUID(new_key()) > keys[-1]
+
+
+@pytest.mark.parametrize('storage, sql_type', [('string', 'text'), ('native', 'text'), ('binary', 'blob')])
+def test_key_storage(make_app, storage, sql_type):
+    client = make_app(db_key_storage=storage).test_client()
+
+    owner_uid = client.post('/api/platform/v1/owners', json={'name': f'{storage}-owner'}).json['uid']
+    response = client.post('/api/platform/v1/resources:batch',
+                           json=[{'name': f'{storage}-resource-{i}', 'owner_uid': owner_uid} for i in range(3)]
+                                + [{'name': 'orphan', 'owner_uid': 'not-a-uuid'}])
+    assert [item['code'] for item in response.json['items']] == [201, 201, 201, 404]
+    uids = [item['uid'] for item in response.json['items'][:3]]
+    assert uids == sorted(uids)
+
+    resource = client.get(f'/api/platform/v1/resources/{uids[1]}').json
+    assert (resource['uid'], resource['owner_uid']) == (uids[1], owner_uid)
+    assert client.get('/api/platform/v1/resources/not-a-uuid').status_code == 404
+    response = client.post('/api/platform/v1/resources:lookup', json={'uids': [uids[2], 'not-a-uuid', uids[0]]})
+    assert [r['uid'] for r in response.json['resources']] == [uids[2], uids[0]]
+    assert response.json['missing'] == ['not-a-uuid']
+
+    response = client.get('/api/platform/v1/resources', query_string={'limit': 2})
+    assert [r['uid'] for r in response.json] == uids[:2]
+    response = client.get(response.headers['Link'].split(';')[0].strip('<>'))
+    assert [r['uid'] for r in response.json] == uids[2:]
+    response = client.get(f'/api/platform/v1/owners/{owner_uid}', query_string={'include': 'resources'})
+    assert sorted(r['uid'] for r in response.json['resources']) == uids
+
+    upper_owner_uid = owner_uid.upper()
+    response = client.post('/api/platform/v1/owners:lookup', json={'uids': [upper_owner_uid]})
+    assert ([o['uid'] for o in response.json['owners']], response.json['missing']) == ([owner_uid], [])
+    response = client.post('/api/platform/v1/resources:lookup', json={'uids': [uids[0].upper()]})
+    assert [r['uid'] for r in response.json['resources']] == [uids[0]]
+    response = client.post('/api/platform/v1/resources:batch',
+                           json=[{'name': f'{storage}-upper', 'owner_uid': upper_owner_uid},
+                                 {'name': f'{storage}-resource-0', 'owner_uid': upper_owner_uid}])
+    assert [item['code'] for item in response.json['items']] == [201, 409]
+    response = client.get(f'/api/platform/v1/resources/{response.json["items"][0]["uid"]}')
+    assert response.json['owner_uid'] == owner_uid
+    assert client.get(f'/api/platform/v1/owners/{upper_owner_uid}').json['uid'] == owner_uid
+
+    assert client.delete(f'/api/platform/v1/resources/{uids[0]}').status_code == 204
+
+    with client.application.app_context():
+        with db.engine.connect() as connection:
+            stored = connection.execute(sqlalchemy.text('SELECT uid, typeof(uid) FROM resources')).first()
+    assert stored[1] == sql_type
+    assert len(stored[0]) == {'string': 36, 'native': 32, 'binary': 16}[storage]
+
+
+@pytest.mark.parametrize('storage', ['string', 'native', 'binary'])
+def test_uppercase_keys_in_paths(make_app, storage):
+    client = make_app(db_key_storage=storage, cache_enabled=True).test_client()
+    owner_uid = client.post('/api/platform/v1/owners', json={'name': 'cased-owner'}).json['uid']
+    resource_uid = client.post('/api/platform/v1/resources',
+                               json={'name': 'cased-resource', 'owner_uid': owner_uid}).json['uid']
+    owner_path, resource_path = f'/api/platform/v1/owners/{owner_uid}', f'/api/platform/v1/resources/{resource_uid}'
+
+    assert client.get(resource_path).json['name'] == 'cased-resource'
+    response = client.put(f'/api/platform/v1/resources/{resource_uid.upper()}',
+                          json={'name': 'renamed-resource', 'owner_uid': owner_uid})
+    assert response.status_code == 200
+    assert client.get(resource_path).json['name'] == 'renamed-resource'
+    assert client.get(f'/api/platform/v1/resources/{resource_uid.upper()}').json['uid'] == resource_uid
+
+    assert client.get(owner_path).json['name'] == 'cased-owner'
+    response = client.put(f'/api/platform/v1/owners/{owner_uid.upper()}', json={'name': 'renamed-owner'})
+    assert response.status_code == 200
+    assert client.get(owner_path).json['name'] == 'renamed-owner'
+    response = client.get(f'/api/platform/v1/owners/{owner_uid.upper()}/resources')
+    assert [r['uid'] for r in response.json] == [resource_uid]
+
+    assert client.delete(f'/api/platform/v1/resources/{resource_uid.upper()}').status_code == 204
+    assert client.get(resource_path).status_code == 404
+    assert client.delete(f'/api/platform/v1/owners/{owner_uid.upper()}').status_code == 204
+    assert client.get(owner_path).status_code == 404
+
+
+def test_unknown_key_storage(make_config):
+    with pytest.raises(ValueError):
+        create_app(make_config(db_key_storage='varchar'))
@@ -0,0 +1,91 @@
+#  MIT License
+#
+#  Copyright (c) 2025 Mathieu Imfeld
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+import os
+import subprocess
+import sys
+
+import pytest
+import flask.testing
+
+prometheus_client = pytest.importorskip('prometheus_client')
+from prometheus_client.parser import text_string_to_metric_families
+
+
+HEALTHZ = {'blueprint': 'healthz', 'endpoint': 'healthz.healthz', 'method': 'GET', 'status': '200'}
+
+
+def _sample(name: str, labels: dict | None = None) -> float:
+    return prometheus_client.REGISTRY.get_sample_value(name, labels or {}) or 0.0
+
+
+def test_metrics(client: flask.testing.Client):
+    requests = _sample('mpaflask_http_request_duration_seconds_count', HEALTHZ)
+    queries = _sample('mpaflask_db_query_duration_seconds_count')
+    dumps = _sample('mpaflask_serialization_duration_seconds_count')
+
+    assert client.get('/api/healthz/').status_code == 200
+    assert client.get('/api/platform/v1/owners').status_code == 200
+
+    assert _sample('mpaflask_http_request_duration_seconds_count', HEALTHZ) == requests + 1
+    assert _sample('mpaflask_db_query_duration_seconds_count') > queries
+    assert _sample('mpaflask_serialization_duration_seconds_count') == dumps + 2
+    assert _sample('mpaflask_http_requests_in_flight') == 0
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    assert b'mpaflask_http_request_duration_seconds_bucket{blueprint="healthz"' in response.data
+
+
+def test_metrics_aggregate_across_processes(tmp_path):
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path))
+    serve = 'from mrmat_python_api_flask import app\n' \
+            'client = app.test_client()\n' \
+            'for _ in range(3):\n' \
+            '    assert client.get("/api/healthz/").status_code == 200\n'
+    for _ in range(2):
+        subprocess.run([sys.executable, '-c', serve], env=env, check=True)
+    scrape = 'from mrmat_python_api_flask import app\n' \
+             'print(app.test_client().get("/metrics").get_data(as_text=True))\n'
+    result = subprocess.run([sys.executable, '-c', scrape], env=env, check=True, capture_output=True, text=True)
+    families = {family.name: family for family in text_string_to_metric_families(result.stdout)}
+    counts = [sample.value for sample in families['mpaflask_http_request_duration_seconds'].samples
+              if sample.name.endswith('_count') and sample.labels.get('endpoint') == 'healthz.healthz']
+    assert counts == [6.0]
+
+
+def test_metrics_of_caches(make_app):
+    client = make_app(cache_enabled=True, cache_size=1).test_client()
+    hits = _sample('mpaflask_cache_lookups_total', {'cache': 'owners', 'result': 'hit'})
+    misses = _sample('mpaflask_cache_lookups_total', {'cache': 'owners', 'result': 'miss'})
+    evictions = _sample('mpaflask_cache_removals_total', {'cache': 'owners', 'reason': 'evicted'})
+
+    uids = [client.post('/api/platform/v1/owners', json={'name': f'metered-owner-{i}'}).json['uid'] for i in range(2)]
+    for uid in uids + uids[-1:]:
+        assert client.get(f'/api/platform/v1/owners/{uid}').status_code == 200
+
+    assert _sample('mpaflask_cache_lookups_total', {'cache': 'owners', 'result': 'hit'}) == hits + 1
+    assert _sample('mpaflask_cache_lookups_total', {'cache': 'owners', 'result': 'miss'}) == misses + 2
+    assert _sample('mpaflask_cache_removals_total', {'cache': 'owners', 'reason': 'evicted'}) == evictions + 1
+    assert _sample('mpaflask_cache_entries', {'cache': 'owners'}) == 1
+    assert b'mpaflask_cache_lookups_total{cache="owners",result="hit"}' in client.get('/metrics').data
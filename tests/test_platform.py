@@ -20,16 +20,24 @@
 #  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 #  SOFTWARE.
 
+import json
+
 import flask.testing
+import sqlalchemy
+
+from mrmat_python_api_flask import db
+from mrmat_python_api_flask.apis import encode_cursor
 
 from mrmat_python_api_flask.apis.platform.v1 import (
     Owner,
     OwnerInput, owner_input_schema,
-    owner_schema, owners_schema,
+    owner_schema, owners_schema, owner_document_schema,
     Resource,
     ResourceInput, resource_input_schema,
-    resource_schema, resources_schema
+    resource_schema, resources_schema,
+    batch_result_schema, owner_lookup_schema, resource_lookup_schema
 )
+from mrmat_python_api_flask.apis.platform.v1 import api as platform_api
 
 def test_platform_v1(client: flask.testing.Client):
     response = client.get('/api/platform/v1/owners')
@@ -119,3 +127,286 @@ def test_platform_v1(client: flask.testing.Client):
     assert response.status_code == 204
     response = client.delete(f'/api/platform/v1/owners/{owner_created.uid}')
     assert response.status_code == 410
+
+def test_platform_v1_pagination(client: flask.testing.Client):
+    response = client.post('/api/platform/v1/owners',
+                           json=owner_input_schema.dump(OwnerInput(name='paging-owner')))
+    assert response.status_code == 201
+    owner_created = owner_schema.load(response.json)
+    created = set()
+    for i in range(5):
+        resource = resource_input_schema.dump(
+            ResourceInput(name=f'paging-resource-{i}', owner_uid=owner_created.uid))
+        response = client.post('/api/platform/v1/resources', json=resource)
+        assert response.status_code == 201
+        created.add(resource_schema.load(response.json).uid)
+
+    seen = []
+    url = '/api/platform/v1/resources?limit=2'
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        page = resources_schema.load(response.json)
+        assert len(page) <= 2
+        seen.extend([r.uid for r in page])
+        url = response.headers.get('Link', '').partition('>')[0].lstrip('<') or None
+    assert created.issubset(set(seen))
+    assert seen == sorted(seen)
+    assert len(seen) == len(set(seen))
+
+    response = client.get('/api/platform/v1/owners', query_string={'limit': 1})
+    assert response.status_code == 200
+    assert len(response.json) == 1
+
+    response = client.get('/api/platform/v1/resources', query_string={'after': '!not-a-cursor!'})
+    assert response.status_code == 422
+    response = client.get('/api/platform/v1/resources', query_string={'limit': 0})
+    assert response.status_code == 422
+
+def test_platform_v1_streaming(client: flask.testing.Client):
+    response = client.post('/api/platform/v1/owners',
+                           json=owner_input_schema.dump(OwnerInput(name='streaming-owner')))
+    assert response.status_code == 201
+    owner_created = owner_schema.load(response.json)
+    for i in range(3):
+        resource = resource_input_schema.dump(
+            ResourceInput(name=f'streaming-resource-{i}', owner_uid=owner_created.uid))
+        assert client.post('/api/platform/v1/resources', json=resource).status_code == 201
+
+    response = client.get('/api/platform/v1/resources', query_string={'stream': 1, 'limit': 1})
+    assert response.status_code == 200
+    assert response.mimetype == 'application/json'
+    streamed = resources_schema.load(response.json)
+    assert len(streamed) >= 3
+    assert [r.uid for r in streamed] == sorted(r.uid for r in streamed)
+
+    response = client.get('/api/platform/v1/resources', headers={'Accept': 'application/x-ndjson'})
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    lines = response.get_data(as_text=True).splitlines()
+    assert [resource_schema.loads(line).uid for line in lines] == [r.uid for r in streamed]
+
+    response = client.get('/api/platform/v1/owners',
+                          query_string={'stream': 1, 'after': encode_cursor('~')})
+    assert response.status_code == 200
+    assert response.json == []
+
+def test_platform_v1_batch(client: flask.testing.Client):
+    response = client.post('/api/platform/v1/owners:batch',
+                           json=owner_input_schema.dump([OwnerInput(name='batch-owner'),
+                                                         OwnerInput(name='other-batch-owner')], many=True))
+    assert response.status_code == 200
+    result = batch_result_schema.load(response.json)
+    assert (result.created, result.failed) == (2, 0)
+    owner_uid = result.items[0].uid
+    assert client.get(f'/api/platform/v1/owners/{owner_uid}').status_code == 200
+
+    resources = [ResourceInput(name=f'batch-resource-{i}', owner_uid=owner_uid) for i in range(3)]
+    resources.append(ResourceInput(name='batch-resource-0', owner_uid=owner_uid))
+    resources.append(ResourceInput(name='batch-resource-9', owner_uid='unknown-owner'))
+    response = client.post('/api/platform/v1/resources:batch',
+                           json=resource_input_schema.dump(resources, many=True))
+    assert response.status_code == 200
+    result = batch_result_schema.load(response.json)
+    assert (result.created, result.failed) == (3, 2)
+    assert [item.code for item in result.items] == [201, 201, 201, 409, 404]
+    for item in result.items[:3]:
+        assert client.get(f'/api/platform/v1/resources/{item.uid}').status_code == 200
+
+    response = client.post('/api/platform/v1/resources:batch',
+                           json=resource_input_schema.dump([ResourceInput(name='batch-resource-1',
+                                                                          owner_uid=owner_uid)], many=True))
+    assert response.status_code == 200
+    assert batch_result_schema.load(response.json).items[0].code == 409
+
+def test_platform_v1_lookup(client: flask.testing.Client, monkeypatch):
+    monkeypatch.setattr(platform_api, 'LOOKUP_CHUNK_SIZE', 2)
+    response = client.post('/api/platform/v1/owners:batch',
+                           json=owner_input_schema.dump([OwnerInput(name='lookup-owner')], many=True))
+    owner_uid = batch_result_schema.load(response.json).items[0].uid
+    response = client.post('/api/platform/v1/resources:batch',
+                           json=resource_input_schema.dump([ResourceInput(name=f'lookup-resource-{i}',
+                                                                          owner_uid=owner_uid)
+                                                            for i in range(5)], many=True))
+    uids = [item.uid for item in batch_result_schema.load(response.json).items]
+
+    wanted = [uids[3], 'unknown-resource', uids[0], uids[4], uids[0], uids[1]]
+    response = client.post('/api/platform/v1/resources:lookup', json={'uids': wanted})
+    assert response.status_code == 200
+    lookup = resource_lookup_schema.load(response.json)
+    assert [r.uid for r in lookup.resources] == [uids[3], uids[0], uids[4], uids[1]]
+    assert all(r.owner_uid == owner_uid for r in lookup.resources)
+    assert lookup.missing == ['unknown-resource']
+
+    response = client.post('/api/platform/v1/owners:lookup', json={'uids': [owner_uid, 'unknown-owner']})
+    assert response.status_code == 200
+    lookup = owner_lookup_schema.load(response.json)
+    assert [o.uid for o in lookup.owners] == [owner_uid]
+    assert lookup.missing == ['unknown-owner']
+
+    response = client.post('/api/platform/v1/owners:lookup', json={'uids': []})
+    assert response.status_code == 422
+
+def test_platform_v1_conditional(client: flask.testing.Client):
+    response = client.post('/api/platform/v1/owners', json={'name': 'conditional-owner'})
+    assert response.status_code == 201
+    owner_uid, owner_etag = response.json['uid'], response.headers['ETag']
+    response = client.post('/api/platform/v1/resources',
+                           json={'name': 'conditional-resource', 'owner_uid': owner_uid})
+    assert response.status_code == 201
+    resource_uid, resource_etag = response.json['uid'], response.headers['ETag']
+
+    response = client.get(f'/api/platform/v1/resources/{resource_uid}')
+    assert response.headers['ETag'] == resource_etag
+    response = client.get(f'/api/platform/v1/resources/{resource_uid}', headers={'If-None-Match': resource_etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    response = client.get(f'/api/platform/v1/owners/{owner_uid}', headers={'If-None-Match': owner_etag})
+    assert response.status_code == 304
+    response = client.get(f'/api/platform/v1/owners/{owner_uid}', headers={'If-None-Match': '"other"'})
+    assert response.status_code == 200
+
+    response = client.put(f'/api/platform/v1/resources/{resource_uid}',
+                          json={'name': 'conditional-modified', 'owner_uid': owner_uid},
+                          headers={'If-Match': resource_etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != resource_etag
+    response = client.put(f'/api/platform/v1/resources/{resource_uid}',
+                          json={'name': 'conditional-lost-update', 'owner_uid': owner_uid},
+                          headers={'If-Match': resource_etag})
+    assert response.status_code == 412
+    response = client.get(f'/api/platform/v1/resources/{resource_uid}', headers={'If-None-Match': resource_etag})
+    assert response.status_code == 200
+    assert response.json['name'] == 'conditional-modified'
+
+    response = client.delete(f'/api/platform/v1/resources/{resource_uid}', headers={'If-Match': resource_etag})
+    assert response.status_code == 412
+    response = client.delete(f'/api/platform/v1/resources/{resource_uid}',
+                             headers={'If-Match': client.get(f'/api/platform/v1/resources/{resource_uid}')
+                                                        .headers['ETag']})
+    assert response.status_code == 204
+    response = client.delete(f'/api/platform/v1/owners/{owner_uid}', headers={'If-Match': owner_etag})
+    assert response.status_code == 204
+
+def test_platform_v1_owner_resources(client: flask.testing.Client):
+    owner_uid = client.post('/api/platform/v1/owners', json={'name': 'scoped-owner'}).json['uid']
+    other_uid = client.post('/api/platform/v1/owners', json={'name': 'other-scoped-owner'}).json['uid']
+    response = client.post('/api/platform/v1/resources:batch',
+                           json=[{'name': f'scoped-resource-{i}', 'owner_uid': uid}
+                                 for i in range(3) for uid in (owner_uid, other_uid)])
+    created = sorted(item['uid'] for item in response.json['items'][::2])
+
+    seen = []
+    url = f'/api/platform/v1/owners/{owner_uid}/resources?limit=2'
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        page = resources_schema.load(response.json)
+        assert all(r.owner_uid == owner_uid for r in page)
+        seen.extend(r.uid for r in page)
+        url = response.headers.get('Link', '').partition('>')[0].lstrip('<') or None
+    assert seen == created
+
+    response = client.get('/api/platform/v1/owners/unknown-owner/resources')
+    assert response.status_code == 404
+    response = client.get('/api/platform/v1/owners/unknown-owner/resources', query_string={'stream': 1})
+    assert response.status_code == 404
+    response = client.get('/api/platform/v1/owners/unknown-owner/resources',
+                          headers={'Accept': platform_api.NDJSON_MIMETYPE})
+    assert response.status_code == 404
+
+    statements = []
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    with client.application.app_context():
+        engine = db.engine
+    sqlalchemy.event.listen(engine, 'before_cursor_execute', count)
+    try:
+        response = client.get(f'/api/platform/v1/owners/{owner_uid}', query_string={'include': 'resources'})
+    finally:
+        sqlalchemy.event.remove(engine, 'before_cursor_execute', count)
+    assert response.status_code == 200
+    document = owner_document_schema.load(response.json)
+    assert document.uid == owner_uid
+    assert sorted(r.uid for r in document.resources) == created
+    assert len(statements) == 2
+
+    response = client.get(f'/api/platform/v1/owners/{owner_uid}')
+    assert 'resources' not in response.json
+    response = client.get(f'/api/platform/v1/owners/{owner_uid}', query_string={'include': 'owners'})
+    assert response.status_code == 422
+
+def test_platform_v1_owner_counts(client: flask.testing.Client, monkeypatch):
+    monkeypatch.setitem(client.application.extensions['mrmat_python_api_flask']['caches'],
+                        'owner_counts',
+                        platform_api.EntityCache())
+    busy_uid = client.post('/api/platform/v1/owners', json={'name': 'busy-owner'}).json['uid']
+    idle_uid = client.post('/api/platform/v1/owners', json={'name': 'idle-owner'}).json['uid']
+    client.post('/api/platform/v1/resources:batch',
+                json=[{'name': f'counted-resource-{i}', 'owner_uid': busy_uid} for i in range(3)])
+
+    def counts():
+        response = client.get('/api/platform/v1/owners', query_string={'with_counts': 1, 'limit': 1000})
+        assert response.status_code == 200
+        return {owner['uid']: owner['resource_count'] for owner in response.json}
+
+    assert counts()[busy_uid] == 3
+    assert counts()[idle_uid] == 0
+    assert 'resource_count' not in client.get('/api/platform/v1/owners').json[0]
+
+    response = client.get('/api/platform/v1/owners', query_string={'with_counts': 1, 'limit': 1})
+    assert 'resource_count' in response.json[0]
+    response = client.get(response.headers['Link'].split(';')[0].strip('<>'))
+    assert response.status_code == 200
+    assert len(response.json) == 1
+    assert 'resource_count' in response.json[0]
+
+    resource_uid = client.post('/api/platform/v1/resources',
+                               json={'name': 'late-resource', 'owner_uid': idle_uid}).json['uid']
+    assert counts()[idle_uid] == 1
+    client.delete(f'/api/platform/v1/resources/{resource_uid}')
+    assert counts()[idle_uid] == 0
+
+    response = client.get('/api/platform/v1/owners', query_string={'with_counts': 1, 'stream': 1},
+                          headers={'Accept': platform_api.NDJSON_MIMETYPE})
+    streamed = [json.loads(line) for line in response.data.splitlines()]
+    assert {owner['uid']: owner['resource_count'] for owner in streamed}[busy_uid] == 3
+
+def test_platform_v1_import(client: flask.testing.Client, monkeypatch):
+    monkeypatch.setattr(platform_api, 'IMPORT_CHUNK_SIZE', 2)
+    monkeypatch.setattr(platform_api, 'IMPORT_MAX_LINE', 128)
+    monkeypatch.setattr(platform_api, 'IMPORT_READ_SIZE', 7)
+    owner_uid = client.post('/api/platform/v1/owners', json={'name': 'import-owner'}).json['uid']
+
+    lines = [json.dumps({'name': f'imported-{i}', 'owner_uid': owner_uid}) for i in range(3)]
+    lines += ['', 'not json', json.dumps({'name': 'imported-0', 'owner_uid': owner_uid}),
+              json.dumps({'name': 'orphan', 'owner_uid': 'unknown-owner'}), json.dumps({'name': 'x' * 200}),
+              json.dumps({'owner_uid': owner_uid}), json.dumps({'name': 'imported-3', 'owner_uid': owner_uid})]
+    response = client.post('/api/platform/v1/resources:import', data='\n'.join(lines) + '\n',
+                           content_type=platform_api.NDJSON_MIMETYPE)
+    assert response.status_code == 200
+    result = response.json
+    assert (result['records'], result['created'], result['failed'], result['chunks']) == (9, 4, 5, 5)
+    assert [(error['line'], error['code']) for error in result['errors']] == \
+           [(5, 400), (6, 409), (7, 404), (8, 413), (9, 400)]
+    assert result['errors'][4]['msg'].startswith('name:')
+    assert result['errors_truncated'] is False
+
+    response = client.get(f'/api/platform/v1/owners/{owner_uid}/resources')
+    assert sorted(resource['name'] for resource in response.json) == [f'imported-{i}' for i in range(4)]
+
+    monkeypatch.setattr(platform_api, 'IMPORT_MAX_ERRORS', 1)
+    upload = (f'owner_uid,name\r\n{owner_uid},"imported, from CSV"\r\n{owner_uid},imported-0\r\n'
+              f'unknown-owner,orphan\r\n')
+    response = client.post('/api/platform/v1/resources:import', data=upload.encode('utf-8'),
+                           content_type='text/csv; charset=utf-8')
+    assert response.status_code == 200
+    result = response.json
+    assert (result['records'], result['created'], result['failed']) == (3, 1, 2)
+    assert [(error['line'], error['code']) for error in result['errors']] == [(3, 409)]
+    assert result['errors_truncated'] is True
+    response = client.get(f'/api/platform/v1/owners/{owner_uid}/resources')
+    assert 'imported, from CSV' in [resource['name'] for resource in response.json]
+
+    response = client.post('/api/platform/v1/resources:import', json=[{'name': 'x', 'owner_uid': owner_uid}])
+    assert response.status_code == 415
@@ -0,0 +1,124 @@
+#  MIT License
+#
+#  Copyright (c) 2025 Mathieu Imfeld
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+import pstats
+import threading
+
+import pytest
+
+from mrmat_python_api_flask.profiling import ProfilingMiddleware, TOKEN_HEADER, create_token
+
+
+@pytest.fixture()
+def profiled(make_app, tmp_path):
+    app = make_app(secret_key='profiling-secret',
+                   profiling_enabled=True,
+                   profiling_dir=str(tmp_path / 'profiles'),
+                   profiling_keep=2)
+    return app.test_client(), {TOKEN_HEADER: create_token('profiling-secret')}, tmp_path / 'profiles'
+
+
+def test_profile_on_token(profiled):
+    client, headers, directory = profiled
+    client.get('/api/platform/v1/owners')
+    client.get('/api/platform/v1/owners', headers={TOKEN_HEADER: 'forged'})
+    assert not list(directory.iterdir())
+
+    assert client.get('/api/platform/v1/owners', headers=headers).status_code == 200
+    names = sorted(path.name for path in directory.iterdir())
+    assert [name.rsplit('.', 1)[1] for name in names] == ['collapsed', 'pstats']
+    assert '-GET-api_platform_v1_owners-' in names[0]
+    stats = pstats.Stats(str(directory / names[1]))
+    assert any(function == 'get_owners' for (_, _, function) in stats.stats)
+
+
+def test_profiles_are_pruned(profiled):
+    client, headers, directory = profiled
+    for _ in range(4):
+        client.get('/api/healthz/', headers=headers)
+    assert len(list(directory.glob('*.pstats'))) == 2
+    assert len(list(directory.glob('*.collapsed'))) == 2
+
+
+def test_profiling_api(profiled):
+    client, headers, directory = profiled
+    assert client.get('/api/profiling/').status_code == 401
+    client.get('/api/healthz/', headers=headers)
+
+    response = client.get('/api/profiling/', headers=headers)
+    assert response.status_code == 200
+    assert response.json['sample_rate'] == 0.0
+    assert len(response.json['profiles']) == 2
+    assert len(list(directory.iterdir())) == 2
+
+    name = [profile['name'] for profile in response.json['profiles'] if profile['name'].endswith('.pstats')][0]
+    response = client.get(f'/api/profiling/{name}', headers=headers)
+    assert response.status_code == 200
+    assert response.data == (directory / name).read_bytes()
+    assert client.get('/api/profiling/missing.pstats', headers=headers).status_code == 404
+    assert client.get('/api/profiling/profiling.db', headers=headers).status_code == 404
+
+    response = client.put('/api/profiling/settings', headers=headers, json={'sample_rate': 1.0})
+    assert response.status_code == 200
+    assert client.put('/api/profiling/settings', headers=headers, json={'sample_rate': 2.0}).status_code == 422
+    client.get('/api/healthz/')
+    assert len(list(directory.glob('*.pstats'))) == 2
+
+
+def test_profiling_off_by_default(client):
+    assert not isinstance(client.application.wsgi_app, ProfilingMiddleware)
+    assert client.get('/api/profiling/').status_code == 404
+
+
+def test_concurrent_profiled_requests(tmp_path):
+    entered, release = threading.Event(), threading.Event()
+
+    def app(environ, start_response):
+        if environ['PATH_INFO'] == '/slow':
+            entered.set()
+            release.wait(5)
+        start_response('200 OK', [('Content-Type', 'text/plain')])
+        return [b'OK']
+
+    middleware = ProfilingMiddleware(app, secret_key='secret', directory=str(tmp_path), sample_rate=1.0)
+    statuses = []
+
+    def request(path: str):
+        statuses.append(middleware({'PATH_INFO': path, 'REQUEST_METHOD': 'GET'},
+                                   lambda status, headers: statuses.append(status)))
+
+    slow = threading.Thread(target=request, args=('/slow',))
+    slow.start()
+    assert entered.wait(5)
+    concurrent = [threading.Thread(target=request, args=('/fast',)) for _ in range(4)]
+    for thread in concurrent:
+        thread.start()
+    for thread in concurrent:
+        thread.join()
+    release.set()
+    slow.join()
+
+    assert statuses.count('200 OK') == 5
+    assert len(list(tmp_path.glob('*.pstats'))) == 1
+    assert len(list(tmp_path.glob('*-GET-slow-*.collapsed'))) == 1
+    request('/fast')
+    assert len(list(tmp_path.glob('*.pstats'))) == 2
@@ -0,0 +1,76 @@
+#  MIT License
+#
+#  Copyright (c) 2025 Mathieu Imfeld
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+import json
+import logging
+
+import pytest
+
+from mrmat_python_api_flask import db, metrics
+
+
+@pytest.fixture()
+def timed_client(make_app):
+    return make_app(db_query_headers=True, db_slow_query_ms=0.000001).test_client()
+
+
+def test_query_headers(timed_client):
+    timed_client.get('/api/healthz/')
+    owner_uid = timed_client.post('/api/platform/v1/owners', json={'name': 'timed-owner'}).json['uid']
+    timed_client.post('/api/platform/v1/resources:batch',
+                      json=[{'name': f'timed-resource-{i}', 'owner_uid': owner_uid} for i in range(5)])
+
+    response = timed_client.get('/api/healthz/')
+    assert response.headers['X-DB-Queries'] == '0'
+    response = timed_client.get('/api/platform/v1/owners')
+    assert response.headers['X-DB-Queries'] == '1'
+    response = timed_client.get(f'/api/platform/v1/owners/{owner_uid}', query_string={'include': 'resources'})
+    assert response.headers['X-DB-Queries'] == '2'
+    assert response.headers['Server-Timing'].startswith('db;dur=')
+    assert 'desc="2 queries"' in response.headers['Server-Timing']
+    assert 'db-slowest;dur=' in response.headers['Server-Timing']
+
+
+def test_slow_query_log(timed_client, caplog):
+    timed_client.get('/api/healthz/')
+    caplog.clear()
+    with caplog.at_level(logging.WARNING, logger='mrmat_python_api_flask.slow_queries'):
+        timed_client.get('/api/platform/v1/owners')
+    entries = [json.loads(record.getMessage()) for record in caplog.records
+               if record.name == 'mrmat_python_api_flask.slow_queries']
+    assert len(entries) == 1
+    assert entries[0]['event'] == 'slow_query'
+    assert entries[0]['endpoint'] == 'platform_v1.get_owners'
+    assert entries[0]['statement'].startswith('SELECT owners.uid')
+    assert entries[0]['duration_ms'] >= 0
+
+
+def test_query_timing_off_by_default(client):
+    assert 'X-DB-Queries' not in client.get('/api/platform/v1/owners').headers
+
+
+def test_statements_timed_once(timed_client):
+    with timed_client.application.app_context():
+        engine = db.engine
+    assert len(engine.dispatch.before_cursor_execute) == 1
+    assert len(engine.dispatch.after_cursor_execute) == 1
+    assert len(engine.statement_observers) == (2 if metrics.prometheus_client is not None else 1)
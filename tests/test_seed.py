@@ -0,0 +1,49 @@
+#  MIT License
+#
+#  Copyright (c) 2025 Mathieu Imfeld
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+from sqlalchemy import func, select
+
+from mrmat_python_api_flask import db
+from mrmat_python_api_flask.apis.platform.v1 import Owner, Resource
+
+
+def test_seed(make_app):
+    app = make_app()
+    runner = app.test_cli_runner()
+
+    result = runner.invoke(args=['seed', '--owners', '7', '--resources-per-owner', '3', '--chunk-size', '4',
+                                 '--workers', '2', '--prefix', 'seeded'])
+    assert result.exit_code == 0, result.output
+    assert 'SQLite allows a single writer' in result.output
+    assert 'Seeded 7 owners and 21 resources' in result.output
+    result = runner.invoke(args=['seed', '--owners', '2', '--resources-per-owner', '3', '--prefix', 'seeded'])
+    assert result.exit_code == 0, result.output
+
+    with app.app_context():
+        assert db.session.scalar(select(func.count()).select_from(Owner)) == 9
+        assert db.session.scalar(select(func.count()).select_from(Resource)) == 27
+        per_owner = db.session.execute(select(Resource.owner_uid, func.count(Resource.uid))
+                                       .group_by(Resource.owner_uid)).all()
+        assert sorted(count for _, count in per_owner) == [3] * 9
+
+    client = app.test_client()
+    assert len(client.get('/api/platform/v1/owners').json) == 9
@@ -0,0 +1,144 @@
+#  MIT License
+#
+#  Copyright (c) 2025 Mathieu Imfeld
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+import dataclasses
+import uuid
+
+import pytest
+import flask.testing
+import marshmallow
+from marshmallow import fields
+
+from mrmat_python_api_flask import db
+from mrmat_python_api_flask.serializer import CompiledDumpMixin, compile_dump
+from mrmat_python_api_flask.apis import Status, status_schema
+from mrmat_python_api_flask.apis.greeting.v1 import greeting_v1_schema
+from mrmat_python_api_flask.apis.platform.v1 import (
+    Owner, owner_schema, owners_schema,
+    Resource, resource_schema, resources_schema
+)
+
+
+@pytest.fixture
+def dump_calls(monkeypatch) -> list:
+    """
+    Record the schema of every top-level dump, whether it is compiled or handled by marshmallow
+    """
+    calls = []
+    depth = []
+
+    def counting(original):
+        def counting_dump(self, obj, *args, **kwargs):
+            if not depth:
+                calls.append(type(self).__name__)
+            depth.append(self)
+            try:
+                return original(self, obj, *args, **kwargs)
+            finally:
+                depth.pop()
+        return counting_dump
+
+    monkeypatch.setattr(marshmallow.Schema, 'dump', counting(marshmallow.Schema.dump))
+    monkeypatch.setattr(CompiledDumpMixin, 'dump', counting(CompiledDumpMixin.dump))
+    return calls
+
+
+@pytest.mark.parametrize('url', [
+    '/api/healthz/',
+    '/api/healthz/liveness',
+    '/api/healthz/readiness',
+    '/api/greeting/v1/',
+    '/api/greeting/v2/?name=MrMat',
+    '/api/platform/v1/owners',
+    '/api/platform/v1/resources',
+])
+def test_single_dump_per_request(client: flask.testing.Client, dump_calls: list, url: str):
+    response = client.get(url)
+    assert response.status_code == 200
+    assert len(dump_calls) == 1
+
+
+def test_single_dump_per_status(client: flask.testing.Client, dump_calls: list):
+    response = client.get('/api/platform/v1/resources/unknown')
+    assert response.status_code == 404
+    assert response.json == {'code': 404, 'msg': 'No such resource'}
+    assert dump_calls == ['StatusSchema']
+
+
+@dataclasses.dataclass
+class Partial:
+    uid: str
+
+
+@pytest.mark.parametrize('schema,obj', [
+    (resource_schema, Resource(uid=str(uuid.uuid4()), owner_uid=str(uuid.uuid4()), name='resource')),
+    (resource_schema, Resource(uid=None, owner_uid=None, name=None)),
+    (resource_schema, Partial(uid='partial')),
+    (resource_schema, {'uid': 'mapping', 'name': 42}),
+    (resource_schema, ('not', 'an', 'entity')),
+    (owner_schema, Owner(uid=str(uuid.uuid4()), name='owner')),
+    (owner_schema, {'uid': uuid.uuid4(), 'client_id': b'bytes'}),
+    (status_schema, Status(code=404, msg='Not found')),
+    (status_schema, {'code': '404', 'msg': 404}),
+    (greeting_v1_schema, {}),
+])
+def test_compiled_dump_matches_marshmallow(schema, obj):
+    assert schema._compiled_dump is not None
+    assert schema.dump(obj) == marshmallow.Schema.dump(schema, obj)
+
+
+def test_compiled_dump_many(client: flask.testing.Client):
+    with client.application.app_context():
+        owner = Owner(uid=str(uuid.uuid4()), name='compiled-owner')
+        db.session.add(owner)
+        db.session.add_all([Resource(uid=str(uuid.uuid4()), owner_uid=owner.uid, name=f'compiled-{i}')
+                            for i in range(3)])
+        db.session.commit()
+        rows = db.session.query(Resource.uid, Resource.owner_uid, Resource.name).all()
+        assert resources_schema.dump(rows) == marshmallow.Schema.dump(resources_schema, rows)
+        entities = db.session.query(Owner).all()
+        assert owners_schema.dump(entities) == marshmallow.Schema.dump(owners_schema, entities)
+
+
+class HookedSchema(CompiledDumpMixin, marshmallow.Schema):
+    name = fields.Str()
+    owner = fields.Nested(owner_schema)
+
+    @marshmallow.post_dump
+    def shout(self, data, **kwargs):
+        data['name'] = data['name'].upper()
+        return data
+
+
+def test_uncompilable_schema_falls_back():
+    schema = HookedSchema()
+    assert compile_dump(schema) is None
+    assert schema.dump({'name': 'mrmat'}) == {'name': 'MRMAT'}
+
+
+def test_no_dump_when_not_modified(client: flask.testing.Client, dump_calls: list):
+    owner = client.post('/api/platform/v1/owners', json={'name': 'not-modified-owner'})
+    dump_calls.clear()
+    response = client.get(f'/api/platform/v1/owners/{owner.json["uid"]}',
+                          headers={'If-None-Match': owner.headers['ETag']})
+    assert response.status_code == 304
+    assert dump_calls == []
@@ -0,0 +1,96 @@
+#  MIT License
+#
+#  Copyright (c) 2025 Mathieu Imfeld
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+import threading
+import uuid
+
+from mrmat_python_api_flask import app
+from mrmat_python_api_flask.sessions import get_db, get_engine, remove_db
+from mrmat_python_api_flask.apis.platform.v1 import Owner, Resource
+
+
+def test_registry_reuses_engines_and_sessions(tmp_path):
+    url = f'sqlite:///{tmp_path}/registry.db'
+    assert get_engine(url) is get_engine(url)
+    session = get_db(url)
+    assert get_db(url) is session
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(get_db(url)))
+    thread.start()
+    thread.join()
+    assert other[0] is not session
+
+    remove_db()
+    assert get_db(url) is not session
+    remove_db()
+
+
+def test_sessions_removed_at_teardown(tmp_path):
+    url = f'sqlite:///{tmp_path}/teardown.db'
+    with app.app_context():
+        session = get_db(url)
+    assert get_db(url) is not session
+    remove_db()
+
+
+def test_concurrent_crud(tmp_path):
+    url = f'sqlite:///{tmp_path}/stress.db'
+    threads = 16
+    rounds = 10
+    errors = []
+    sessions = set()
+    lock = threading.Lock()
+
+    def worker():
+        try:
+            for i in range(rounds):
+                session = get_db(url)
+                with lock:
+                    sessions.add(id(session))
+                owner = Owner(uid=str(uuid.uuid4()), name=f'stress-owner-{uuid.uuid4()}')
+                session.add(owner)
+                session.add(Resource(uid=str(uuid.uuid4()), owner_uid=owner.uid, name=f'stress-resource-{i}'))
+                session.commit()
+                owner = session.get(Owner, owner.uid)
+                owner.name = f'{owner.name}-renamed'
+                session.commit()
+                assert session.get(Owner, owner.uid).version == 2
+                for resource in list(owner.resources):
+                    session.delete(resource)
+                session.delete(owner)
+                session.commit()
+                remove_db()
+        except Exception as e:  # pylint: disable=broad-except
+            errors.append(e)
+            remove_db()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    assert errors == []
+    session = get_db(url)
+    assert session.query(Owner).count() == 0
+    assert session.query(Resource).count() == 0
+    remove_db()